@@ -13,9 +13,11 @@ from aiogram.dispatcher import FSMContext
 from keyboards import event_kb, backup_kb
 
 from modelling import utils
-from modelling.utils import get_dataset, get_target
+from modelling.utils import DatasetBuilder, get_target
 
 DATA_PATH = join(os.getcwd(), '..', 'data', 'events')
+STORE_PATH = join(os.getcwd(), '..', 'data', 'features.sqlite')
+dataset_builder = DatasetBuilder(store_path=STORE_PATH)  # reloads changed events only
 import joblib
 model = joblib.load(join(abspath(".."), "modelling", "model.pkl"))
 
@@ -48,7 +50,7 @@ async def inference_player(message: Message, state: FSMContext):
 
         event = data["event"]
         event_dirs = [join(DATA_PATH, event)]
-        teams, players = get_dataset(event_dirs)
+        teams, players = dataset_builder.get_dataset(event_dirs)
         teams = teams.dropna()
         players = players.dropna()
         logging.warning("PARSING COMPLETED!")
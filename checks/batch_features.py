@@ -0,0 +1,68 @@
+"""
+Checks that `get_batch_features` of many teams and configs gives the same
+features frame as `Team.get_features` called for each of them.
+
+Usage (from checks/ directory, as linters.sh):
+    python3 batch_features.py
+    python3 batch_features.py --count 2000 --seed 7
+"""
+
+import argparse
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from parsing.team import Team  # noqa: E402
+from parsing.team._features import get_batch_features  # noqa: E402
+
+
+def random_stats(rng: random.Random):
+    """Preprocessed stats with fields used by the features."""
+    matches = [
+        {
+            "is_winner": rng.randint(0, 1),
+            "rounds_won": np.int32(rng.randint(0, 16)),
+            "rounds_lost": np.int32(rng.randint(0, 16)),
+        }
+        for _ in range(rng.choice([0, 1, 2, 10, 200]))
+    ]
+    events = [
+        {"placement": rng.choice(["1st", "3-4th", "5-8th", "-"])}
+        for _ in range(rng.choice([0, 1, 5]))
+    ]
+    return {
+        "ranking": {
+            "world_ranking": rng.choice([np.int32(3), 50]),
+            "points": rng.choice([np.int32(300), 10]),
+        },
+        "lineups": [{}] * rng.randint(0, 3),
+        "events": events,
+        "matches": matches,
+    }
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument("--count", type=int, default=500, help="random stats")
+    args.add_argument("--seed", type=int, default=0, help="random seed")
+    args = args.parse_args()
+
+    rng = random.Random(args.seed)
+    stats = [random_stats(rng) for _ in range(args.count)]
+    team = Team(key=0, name="check")
+    expected = pd.concat([team.get_features(s) for s in stats], ignore_index=True)
+    try:
+        pd.testing.assert_frame_equal(expected, get_batch_features(stats))
+    except AssertionError as ex:
+        print(f"MISMATCH {ex}")
+        sys.exit(1)
+    print(f"{args.count} stats match.")
+
+
+if __name__ == "__main__":
+    main()
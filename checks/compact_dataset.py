@@ -0,0 +1,56 @@
+"""
+Checks that compacted files of events give the same tables as their JSON
+trees, both when the files are written and when they are read back. Events are
+copied to a temporary directory, so compacted files are not left next to the
+data.
+
+Usage (from checks/ directory, as linters.sh):
+    python3 compact_dataset.py ../data/features/7148 ../data/features/7200
+"""
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modelling.utils import get_dataset  # noqa: E402
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument(
+        "event_dirs", nargs="+", help='event directories parsed with save="features"'
+    )
+    args = args.parse_args()
+
+    mismatches = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        event_dirs = []
+        for event_dir in args.event_dirs:
+            copy = os.path.join(tmp_dir, os.path.basename(os.path.normpath(event_dir)))
+            shutil.copytree(event_dir, copy)
+            event_dirs.append(copy)
+
+        with redirect_stdout(io.StringIO()):  # missing teams of players are printed
+            expected = get_dataset(event_dirs)
+            compacting = get_dataset(event_dirs, compact=True)
+            compacted = get_dataset(event_dirs, compact=True)
+
+        for label, tables in (("compacting", compacting), ("compacted", compacted)):
+            for name, frame, other in zip(("teams", "players"), expected, tables):
+                if not frame.equals(other) or not frame.dtypes.equals(other.dtypes):
+                    mismatches.append(f"{label} {name}")
+
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+    print(f"{len(args.event_dirs)} events, {len(mismatches)} mismatches.")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Checks that `downcast_dataset` keeps every value of the tables of events, and
+reports memory of the tables before and after it.
+
+Usage (from checks/ directory, as linters.sh):
+    python3 downcast_dataset.py ../data/features/7148 ../data/features/7200
+"""
+
+import argparse
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modelling.utils import (  # noqa: E402
+    DATE_COLS,
+    downcast_dataset,
+    get_dataset,
+    memory_report,
+)
+
+
+def compare_downcast(expected: pd.DataFrame, actual: pd.DataFrame):
+    """:returns: columns whose values changed by the downcast"""
+    changed = []
+    for col in expected.columns:
+        values, downcast = expected[col], actual[col]
+        if col in DATE_COLS:
+            same = pd.to_datetime(values).equals(downcast)
+        elif isinstance(downcast.dtype, pd.CategoricalDtype):
+            same = values.equals(downcast.astype(object))
+        elif downcast.dtype != values.dtype and values.dtype != object:
+            same = np.array_equal(
+                downcast.to_numpy(dtype=values.dtype), values.to_numpy(), equal_nan=True
+            )
+        else:
+            same = values.astype(object).equals(downcast.astype(object))
+        if not same:
+            changed.append(col)
+    return changed
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument(
+        "event_dirs", nargs="+", help='event directories parsed with save="features"'
+    )
+    args = args.parse_args()
+
+    with redirect_stdout(io.StringIO()):  # missing teams of players are printed
+        teams, players = get_dataset(args.event_dirs)
+    frames = {"teams": teams, "players": players}
+    frames.update(
+        {f"{name}_downcast": downcast_dataset(df) for name, df in frames.items()}
+    )
+
+    mismatches = [
+        f"{name}.{col}"
+        for name in ("teams", "players")
+        for col in compare_downcast(frames[name], frames[f"{name}_downcast"])
+    ]
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+    print(memory_report(frames))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Checks that the SQLite `EntityStore` keeps what parsed events know:
+    - META files of an event ingested into it give the same rosters and
+      player teams;
+    - maps saved to it are read back normalised, incomplete ones are skipped.
+
+Usage (from checks/ directory, as linters.sh):
+    python3 entity_store.py
+    python3 entity_store.py ../data/features/7148 ../data/features/7200
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from os.path import join
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from parsing.store import EntityStore  # noqa: E402
+
+
+def check_lineups(event_dir: str, tmp_dir: str):
+    maps = dict()
+    for fn in ("event", "team2player", "player2team"):
+        with open(join(event_dir, f"{fn}.json"), "r") as fhandle:
+            maps[fn] = json.load(fhandle)
+    event_id = int(os.path.basename(os.path.normpath(event_dir)))
+    starts_at = maps["event"]["start_at"]
+
+    store = EntityStore(join(tmp_dir, "entities.sqlite"))
+    store.ingest_event_dir(event_dir)
+
+    mismatches = []
+    for team_id, player_ids in maps["team2player"].items():
+        roster = store.roster(int(team_id), starts_at)
+        if roster != sorted(int(player_id) for player_id in player_ids):
+            mismatches.append(f"roster of {team_id}: {player_ids} != {roster}")
+    for player_id, team_id in maps["player2team"].items():
+        team = store.player_team(int(player_id), starts_at)
+        events = store.player_events(int(player_id))
+        if team != int(team_id) or events != [event_id]:
+            mismatches.append(f"player {player_id}: {team_id} != {team}, {events}")
+
+    store.close()
+    return mismatches
+
+
+def check_team_maps(tmp_dir: str):
+    maps = [
+        {
+            "time": "05/01/24",
+            "event": "IEM Katowice",
+            "opponent": "NaVi",
+            "map": "Nuke",
+            "rounds": "16 - 3",
+            "result": " w",
+            "is_last_map": True,
+        },
+        {
+            "time": "04/01/24",
+            "event": None,
+            "opponent": "G2",
+            "map": "Mirage",
+            "rounds": "16 - 14",
+            "result": "L",
+            "is_last_map": True,
+        },
+        {"time": "03/01/24", "event": "Cup", "opponent": "FaZe", "rounds": "16-3"},
+    ]
+    store = EntityStore(join(tmp_dir, "maps.sqlite"))
+    store.add_team_maps(1, maps)
+    rows = store.team_maps(1).drop(columns="team_id").to_dict(orient="records")
+    store.close()
+
+    expected = [
+        {
+            "date": "2024-01-05",
+            "event": "iem katowice",
+            "opponent": "navi",
+            "map": "Nuke",
+            "rounds_won": 16,
+            "rounds_lost": 3,
+            "result": "W",
+            "is_last_map": 1,
+        }
+    ]
+    return [] if rows == expected else [f"team maps: {expected} != {rows}"]
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument(
+        "event_dirs", nargs="*", help='event directories parsed with save="features"'
+    )
+    args = args.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mismatches = check_team_maps(tmp_dir)
+        print(f"team maps: {len(mismatches)} mismatches.")
+        for event_dir in args.event_dirs:
+            with tempfile.TemporaryDirectory(dir=tmp_dir) as event_tmp:
+                event_mismatches = check_lineups(event_dir, event_tmp)
+            print(f"{event_dir}: {len(event_mismatches)} lineups mismatches.")
+            mismatches += event_mismatches
+
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
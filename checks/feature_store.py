@@ -0,0 +1,160 @@
+"""
+Checks that features files of parsed events saved to a `FeatureStore` give the
+same event tables as the files, also when the store has only some teams and
+players, only some configs of an entity or features of another version.
+
+Usage (from checks/ directory, as linters.sh):
+    python3 feature_store.py ../data/features/7148 ../data/features/7200
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from os.path import join
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modelling.utils import get_event_dataset  # noqa: E402
+from parsing.common import (  # noqa: E402
+    EventFilter,
+    RankingFilter,
+    unstack_features_name,
+)
+from parsing.store import Entity, FeatureKey, FeatureStore  # noqa: E402
+
+SORT_COLS = ["start_time", "end_time", "event_fil", "ranking_fil"]
+
+
+def collect_features(event_dir: str, version: str):
+    """:returns: list of (store key, features) of all features files of the event"""
+    items = []
+    for entity, subdir in ((Entity.TEAM, "teams"), (Entity.PLAYER, "players")):
+        for entity_id in sorted(os.listdir(join(event_dir, subdir))):
+            if not entity_id.isdigit():
+                continue
+            entity_dir = join(event_dir, subdir, entity_id)
+            for fn in sorted(os.listdir(entity_dir)):
+                if len(fn.split("_")) != 4:
+                    continue
+                with open(join(entity_dir, fn), "r", encoding="utf-8") as fhandle:
+                    features = json.load(fhandle)
+                if entity == Entity.TEAM:  # one-row `DataFrame.to_dict()`
+                    features = {
+                        name: next(iter(column.values()))
+                        for name, column in features.items()
+                    }
+
+                cfg = unstack_features_name(fn)
+                key = FeatureKey(
+                    entity=entity,
+                    entity_id=int(entity_id),
+                    start_time=cfg["start_time"],
+                    end_time=cfg["end_time"],
+                    event_fil=EventFilter(cfg["event_fil"]),
+                    ranking_fil=RankingFilter(cfg["ranking_fil"]),
+                    version=version,
+                )
+                items.append((key, features))
+    return items
+
+
+def _compare(name: str, expected: pd.DataFrame, actual: pd.DataFrame, by: str):
+    """:returns: description of the difference or None if frames are equal"""
+    if set(expected.columns) != set(actual.columns):
+        return f"{name} columns {sorted(set(expected.columns) ^ set(actual.columns))}"
+
+    # `_read_json` repeats rows of player files, the store keeps one per window
+    expected = expected.drop_duplicates().sort_values([by] + SORT_COLS)
+    expected = expected.reset_index(drop=True)
+    actual = actual[expected.columns].drop_duplicates().sort_values([by] + SORT_COLS)
+    try:  # JSON files are read with less precise float parsing
+        pd.testing.assert_frame_equal(
+            expected, actual.reset_index(drop=True), check_exact=False, rtol=1e-9
+        )
+    except AssertionError as ex:
+        return f"{name}: {ex}"
+    return None
+
+
+def _fill_store(path: str, items):
+    store = FeatureStore(path)
+    store.put_many(items)
+    return store
+
+
+def check_features(event_dir: str, tmp_dir: str):
+    """:returns: list of mismatches and number of features rows in the store"""
+    items = collect_features(event_dir, version="v1")
+    store = _fill_store(join(tmp_dir, "full.sqlite"), items)
+
+    mismatches = []
+    for key, features in items:
+        saved = store.get(key)
+        if json.dumps(saved, default=str) != json.dumps(features, default=str):
+            mismatches.append(f"{key}: {features} != {saved}")
+
+    # half of the teams and players are left to the files
+    ids = sorted({(key.entity, key.entity_id) for key, _ in items}, key=str)[::2]
+    entities = [item for item in items if (item[0].entity, item[0].entity_id) in ids]
+    entities_store = _fill_store(join(tmp_dir, "entities.sqlite"), entities)
+    # every entity is partly migrated, half of its configs are left to the files
+    configs_store = _fill_store(join(tmp_dir, "configs.sqlite"), items[::2])
+    # features of another version are found by it and not mixed into v1 tables
+    v2_items = collect_features(event_dir, version="v2")[::2]
+    v2_store = _fill_store(join(tmp_dir, "v2.sqlite"), v2_items)
+    stores = {
+        "store": (store, "v1"),
+        "entities store": (entities_store, "v1"),
+        "configs store": (configs_store, "v1"),
+        "v2 store": (v2_store, "v2"),
+        "v1 of v2 store": (v2_store, "v1"),
+    }
+
+    with redirect_stdout(io.StringIO()):  # missing teams of players are printed
+        expected = get_event_dataset(event_dir)
+        tables = {
+            label: get_event_dataset(event_dir, store=store, version=version)
+            for label, (store, version) in stores.items()
+        }
+
+    for label, (teams, players) in tables.items():
+        for name, by, actual, i in (
+            ("teams", "team_id", teams, 0),
+            ("players", "player_id", players, 1),
+        ):
+            mismatch = _compare(f"{label} {name}", expected[i], actual, by)
+            if mismatch is not None:
+                mismatches.append(mismatch)
+
+    for store in {store for store, _ in stores.values()}:
+        store.close()
+    return mismatches, len(items)
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument(
+        "event_dirs", nargs="+", help='event directories parsed with save="features"'
+    )
+    args = args.parse_args()
+
+    failed = 0
+    for event_dir in args.event_dirs:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mismatches, rows = check_features(event_dir, tmp_dir)
+        for mismatch in mismatches:
+            print(f"MISMATCH {event_dir}: {mismatch}")
+        print(f"{event_dir}: {rows} features rows, {len(mismatches)} mismatches.")
+        failed += len(mismatches)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Checks that team features of windows derived locally by `MatchHistory` are the
+features of matches, events and lineups within each window.
+
+Usage (from checks/ directory, as linters.sh):
+    python3 history_features.py
+    python3 history_features.py --count 2000 --seed 7
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from parsing.team._features import get_batch_features  # noqa: E402
+from parsing.team._history import MatchHistory  # noqa: E402
+
+
+def check_history(rng: random.Random, count: int):
+    start = date(2022, 1, 1)
+    matches, day = [], start
+    for _ in range(2000):
+        day += timedelta(days=rng.choice([0, 0, 1, 2]))
+        matches.append(
+            {
+                "date": day,
+                "event": f"ev{(day - start).days // 10}",
+                "is_winner": rng.randint(0, 1),
+                "rounds_won": np.int32(rng.randint(0, 16)),
+                "rounds_lost": np.int32(rng.randint(0, 16)),
+            }
+        )
+    events = [
+        {"event": f"ev{k}", "placement": rng.choice(["1st", "3-4th", "5-8th"])}
+        for k in range(200)
+    ][::-1]
+    lineups = [
+        {"start": datetime(2022, 1, 1), "end": datetime(2022, 9, 1)},
+        {"start": datetime(2022, 9, 1), "end": datetime(2030, 1, 1)},
+    ]
+    history = MatchHistory(matches, events, lineups)
+
+    windows = []
+    for _ in range(count):
+        begin = date(2022, 3, 1) + timedelta(days=rng.randint(0, 600))
+        windows.append((begin, begin + timedelta(days=rng.choice([0, 30, 90, 365]))))
+    rankings = [{"world_ranking": 5, "points": 100}] * len(windows)
+    actual = history.get_features(windows, rankings)
+
+    stats = []
+    for (begin, end), ranking in zip(windows, rankings):
+        window = [m for m in matches if begin <= m["date"] <= end]
+        played = {m["event"] for m in window}
+        stats.append(
+            {
+                "ranking": ranking,
+                "matches": window,
+                "events": [e for e in events if e["event"] in played],
+                "lineups": [
+                    lineup
+                    for lineup in lineups
+                    if lineup["start"].date() <= end and begin <= lineup["end"].date()
+                ],
+            }
+        )
+    expected = get_batch_features(stats)
+
+    mismatches = []
+    for i in range(len(windows)):
+        row_expected, row_actual = expected.iloc[i], actual.iloc[i]
+        # history may aggregate matches of a window in another order
+        if not np.allclose(
+            row_expected.astype(float),
+            row_actual.astype(float),
+            rtol=1e-9,
+            atol=0,
+            equal_nan=True,
+        ):
+            mismatches.append(
+                (windows[i], row_expected.to_dict(), row_actual.to_dict())
+            )
+    return mismatches
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument("--count", type=int, default=500, help="random windows")
+    args.add_argument("--seed", type=int, default=0, help="random seed")
+    args = args.parse_args()
+
+    mismatches = check_history(random.Random(args.seed), args.count)
+    for window, expected, actual in mismatches[:5]:
+        print(f"MISMATCH {window}:\n  expected: {expected}\n  actual: {actual}")
+    print(f"{args.count - len(mismatches)}/{args.count} windows match.")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
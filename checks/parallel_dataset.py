@@ -0,0 +1,49 @@
+"""
+Checks that events loaded concurrently give the same tables, in the same
+order, as events loaded one by one, and reports time spent by both.
+
+Usage (from checks/ directory, as linters.sh):
+    python3 parallel_dataset.py ../data/features/* --workers 4
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modelling.utils import get_dataset  # noqa: E402
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument(
+        "event_dirs", nargs="+", help='event directories parsed with save="features"'
+    )
+    args.add_argument("--workers", type=int, default=4, help="concurrent events")
+    args = args.parse_args()
+
+    tables = dict()
+    for workers in (1, args.workers):
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):  # missing teams of players are printed
+            tables[workers] = get_dataset(args.event_dirs, workers=workers)
+        print(f"{workers} workers: {time.perf_counter() - start:.2f}s")
+
+    mismatches = [
+        name
+        for name, frame, other in zip(
+            ("teams", "players"), tables[1], tables[args.workers]
+        )
+        if not frame.equals(other) or not frame.dtypes.equals(other.dtypes)
+    ]
+    for name in mismatches:
+        print(f"MISMATCH {name}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
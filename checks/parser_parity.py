@@ -0,0 +1,160 @@
+"""
+Checks that extractors give identical results on stored pages with the default
+and an alternative HTML parser (optionally restricted by page type strainers),
+and reports time spent by each of them.
+
+Usage (from checks/ directory, as linters.sh):
+    python3 parser_parity.py ../data/events/7148 --parser lxml
+    python3 parser_parity.py ../data/events/7148 --parser html.parser --strain
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from parsing.archive import ARCHIVE_NAME, PageArchive  # noqa: E402
+from parsing.common import EventFilter, make_soup, set_html_parser  # noqa: E402
+from parsing.event._extractor import extract_main_page  # noqa: E402
+from parsing.player import Player, PlayerStat  # noqa: E402
+from parsing.team import Team, TeamStat  # noqa: E402
+
+TEAM_PAGE_TYPES = {
+    "": TeamStat.OVERVIEW,
+    "matches": TeamStat.MATCHES,
+    "events": TeamStat.EVENT_HISTORY,
+}
+PLAYER_PAGE_TYPES = {
+    "": PlayerStat.OVERVIEW,
+    "clutches": PlayerStat.CLUTCHES,
+    "individual": PlayerStat.INDIVIDUAL,
+    "matches": PlayerStat.MATCHES,
+}
+
+
+def _team_extractor(name: str):
+    if name == "lineup.html":
+        return lambda team, src: team.extract_lineups(path=None, src=src)
+    prefix = name.split("_")[0]
+    return {
+        "": lambda team, src: team.extract_overview(path=None, src=src),
+        "matches": lambda team, src: team.extract_matches(path=None, src=src),
+        "events": lambda team, src: team.extract_events(
+            path=None, src=src, match=EventFilter.ALL
+        ),
+    }.get(prefix)
+
+
+def _player_extractor(name: str):
+    prefix = name.split("_")[0]
+    return {
+        "": lambda player, src: player.extract_overview_stats(path=None, src=src),
+        "clutches": lambda player, src: player.extract_clutches_stats(
+            path=None, src=src
+        ),
+        "individual": lambda player, src: player.extract_individual_stats(
+            path=None, src=src
+        ),
+        "matches": lambda player, src: player.extract_matches_stats(path=None, src=src),
+    }.get(prefix)
+
+
+def _event_extractor(_, src):
+    event = SimpleNamespace(teams=[])
+    extract_main_page(event, path=None, src=src)
+    event.teams = [(team.key, team.name) for team in event.teams]
+    return vars(event)
+
+
+def _page_type(name: str):
+    parts = name.split("/")
+    if parts[0] == "teams" and parts[-1] == "lineup.html":
+        return TeamStat.LINEUPS
+    if parts[0] == "teams":
+        return TEAM_PAGE_TYPES.get(parts[-1].split("_")[0])
+    if parts[0] == "players":
+        return PLAYER_PAGE_TYPES.get(parts[-1].split("_")[0])
+    return None
+
+
+def collect_pages(event_dir: str):
+    """:returns: list of (page name, page source, extractor, entity)"""
+    sources = dict()
+    archive_path = os.path.join(event_dir, ARCHIVE_NAME)
+    if os.path.isfile(archive_path):
+        with PageArchive(archive_path, writable=False) as archive:
+            for name in archive.names():
+                sources[name] = archive.get(name)
+
+    for root, _, files in os.walk(event_dir):
+        for fn in files:
+            if fn.endswith(".html"):
+                name = os.path.relpath(os.path.join(root, fn), event_dir)
+                with open(os.path.join(root, fn), "r", encoding="utf-8") as fhandle:
+                    sources[name.replace(os.sep, "/")] = fhandle.read()
+
+    pages = []
+    for name, source in sorted(sources.items()):
+        parts = name.split("/")
+        if parts == ["overview.html"]:
+            pages.append((name, source, _event_extractor, None))
+        elif len(parts) == 3 and parts[0] == "teams" and _team_extractor(parts[2]):
+            team = Team(key=int(parts[1]), name="unknown")
+            pages.append((name, source, _team_extractor(parts[2]), team))
+        elif len(parts) == 3 and parts[0] == "players" and _player_extractor(parts[2]):
+            player = Player(key=int(parts[1]))
+            pages.append((name, source, _player_extractor(parts[2]), player))
+
+    return pages
+
+
+def extract_all(pages, parser: str, strain: bool = False):
+    set_html_parser(parser)
+    results = dict()
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):  # extractors print missing stats
+        for name, source, extractor, entity in pages:
+            try:
+                page_type = _page_type(name) if strain else None
+                strainer = page_type.strainer if page_type is not None else None
+                results[name] = extractor(entity, make_soup(source, strainer))
+            except Exception as ex:
+                results[name] = f"{type(ex).__name__}: {ex}"
+    return results, time.perf_counter() - start
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument("event_dirs", nargs="+", help="event directories with pages")
+    args.add_argument("--parser", default="lxml", help="parser to compare with")
+    args.add_argument("--baseline", default="html.parser", help="reference parser")
+    args.add_argument(
+        "--strain", action="store_true", help="parse only fragments of page types"
+    )
+    args = args.parse_args()
+
+    pages = []
+    for event_dir in args.event_dirs:
+        pages += collect_pages(event_dir)
+    print(f"{len(pages)} pages found.")
+
+    expected, expected_time = extract_all(pages, args.baseline)
+    actual, actual_time = extract_all(pages, args.parser, args.strain)
+
+    mismatches = [name for name in expected if expected[name] != actual[name]]
+    for name in mismatches:
+        print(f"MISMATCH {name}:\n  {args.baseline}: {expected[name]}")
+        print(f"  {args.parser}: {actual[name]}")
+
+    print(f"{args.baseline}: {expected_time:.2f}s, {args.parser}: {actual_time:.2f}s")
+    print(f"{len(pages) - len(mismatches)}/{len(pages)} pages match.")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
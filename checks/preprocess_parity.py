@@ -0,0 +1,121 @@
+"""
+Checks that column-wise `_preprocess_matches` aggregates maps into the same
+matches, with the same value types, as the row-by-row loop it replaced.
+
+Usage (from checks/ directory, as linters.sh):
+    python3 preprocess_parity.py
+    python3 preprocess_parity.py --count 2000 --seed 7
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from parsing.team._preprocessing import _preprocess_matches  # noqa: E402
+
+
+def reference_preprocess_matches(matches):
+    """Row-by-row aggregation of maps into matches, as before `np.add.reduceat`."""
+    data = []
+    cur_match = dict()
+    is_new_match = True
+    for map_ in reversed(matches):
+        if is_new_match:
+            cur_match = {
+                "opponent": map_["opponent"].lower(),
+                "date": datetime.strptime(map_["time"], "%d/%m/%y").date(),
+                "event": map_["event"].lower(),
+                "maps_played": 0,
+                "maps_won": 0,
+                "maps_lost": 0,
+                "maps_res_seq": "",
+                "rounds_played": 0,
+                "rounds_won": 0,
+                "rounds_lost": 0,
+                "rounds_res_seq": "",
+                "is_winner": None,
+            }
+            is_new_match = False
+
+        cur_match["maps_played"] += 1
+        cur_match["maps_won"] += int(map_["result"].lower() == "w")
+        cur_match["maps_lost"] += int(map_["result"].lower() == "l")
+        cur_match["maps_res_seq"] += map_["result"].lower()
+
+        rounds = map_["rounds"].split("-")
+        rounds_won = np.int32(rounds[0].strip())
+        rounds_lost = np.int32(rounds[1].strip())
+        cur_match["rounds_played"] += rounds_won + rounds_lost
+        cur_match["rounds_won"] += rounds_won
+        cur_match["rounds_lost"] += rounds_lost
+        cur_match["rounds_res_seq"] += map_["rounds"].strip() + "|"
+
+        if map_["is_last_map"]:
+            cur_match["is_winner"] = int(cur_match["maps_won"] > cur_match["maps_lost"])
+            data.append(cur_match)
+            is_new_match = True
+
+    return data
+
+
+def _dump(value) -> str:
+    """Values with their types, so np.int32 and int do not compare equal."""
+    return json.dumps(
+        value, default=lambda v: f"{type(v).__name__}:{v}", sort_keys=True
+    )
+
+
+def random_maps(rng: random.Random):
+    """Raw maps of `extract_matches`, latest first, the oldest match unfinished."""
+    maps = []
+    day = date(2023, 1, 1)
+    for _ in range(rng.choice([0, 1, 3, 20, 200])):
+        day += timedelta(days=rng.choice([0, 1, 3]))
+        won, lost = rng.randint(0, 19), rng.randint(0, 19)
+        maps.append(
+            {
+                "time": day.strftime("%d/%m/%y"),
+                "opponent": rng.choice(["NaVi", "G2", "FaZe"]),
+                "event": rng.choice(["Major", "Cup"]),
+                "map": rng.choice(["Mirage", "Nuke"]),
+                "result": rng.choice(["W", "L", "T"]),
+                "rounds": f"{won} - {lost}",
+                "is_last_map": rng.random() < 0.4,
+            }
+        )
+    return maps[::-1]
+
+
+def check_preprocess_matches(rng: random.Random, count: int):
+    mismatches = []
+    for i in range(count):
+        maps = random_maps(rng)
+        expected = _dump(reference_preprocess_matches(maps))
+        actual = _dump(_preprocess_matches(maps))
+        if expected != actual:
+            mismatches.append((i, expected, actual))
+    return mismatches
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument("--count", type=int, default=500, help="random cases")
+    args.add_argument("--seed", type=int, default=0, help="random seed")
+    args = args.parse_args()
+
+    mismatches = check_preprocess_matches(random.Random(args.seed), args.count)
+    for case, expected, actual in mismatches[:5]:
+        print(f"MISMATCH {case}:\n  expected: {expected}\n  actual: {actual}")
+    print(f"{args.count - len(mismatches)}/{args.count} cases match.")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+import json
+from os.path import join
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from modelling.utils import DATE_COLS, get_dataset, get_target
+
+SCHEMA_NAME = "schema.json"
+ARRAY_NAMES = {"X": "X.npy", "y": "y.npy", "meta": "meta.npy"}
+
+TEAM_DROP_COLS = ["event_fil", "ranking_fil", "is_lan", "is_qual", "prize_pool", "duration",
+                  "event_id"] + [f"player_id_{i + 1}" for i in range(5)]
+META_COLS = ["event_id", "player_id", "team_id", "config"]
+CONFIG_COLS = ["start_time", "end_time", "event_fil", "ranking_fil"]
+TARGET_COLS = ["target", "wr_target", "expected_pts_target"]
+NAME_COLS = ["team_name", "player_name"]
+
+
+class TrainingMatrix(NamedTuple):
+    X: np.ndarray  # features, rows x schema["features"]
+    y: np.ndarray  # targets, rows x schema["targets"]
+    meta: np.ndarray  # event_id, player_id, team_id and index of schema["configs"]
+    schema: Dict
+
+    def feature_index(self, names: List[str]) -> List[int]:
+        """:returns: columns of X with given features"""
+        features = self.schema["features"]
+        return [features.index(name) for name in names]
+
+    def event_mask(self, event_ids: List[int]) -> np.ndarray:
+        """:returns: mask of rows of given events, e.g. for train/test splits"""
+        return np.isin(self.meta[:, 0], event_ids)
+
+
+def _is_bool(values: pd.Series) -> bool:
+    return len(values) > 0 and values.map(type).eq(bool).all()
+
+
+def training_frame(teams: pd.DataFrame, players: pd.DataFrame) -> pd.DataFrame:
+    """Joins players with features of their teams and calculates the target."""
+    teams = teams.dropna()
+    players = players.dropna()
+    df = players.drop(DATE_COLS, axis=1).merge(
+        teams.drop(TEAM_DROP_COLS + DATE_COLS, axis=1), on="team_id"
+    ).drop_duplicates()
+    df["target"] = get_target(df.expected_pts_target, df.wr_target)
+    return df.reset_index(drop=True)
+
+
+def build_matrix(event_dirs: List[str], path: str, dtype=np.float32, workers: int = 1) -> Dict:
+    """
+    Writes feature matrix, targets and rows metadata of all events into `.npy`
+    files in `path`, so they can be memory-mapped by `load_matrix`.
+    Rows are players with features of their teams, see `training_frame`.
+    :param event_dirs: directories of events
+    :param path: directory to save matrix to
+    :param dtype: dtype of the feature matrix
+    :param workers: number of events loaded concurrently, see `get_dataset`
+    :returns: schema saved next to the arrays
+    """
+    os.makedirs(path, exist_ok=True)
+    # schema of a previous build marks the arrays as complete, see `load_matrix`
+    if os.path.exists(join(path, SCHEMA_NAME)):
+        os.remove(join(path, SCHEMA_NAME))
+    teams, players = get_dataset(event_dirs, workers=workers)
+    # windows are dropped with the dates by the join, so they are kept as codes
+    players["config"] = players.groupby(CONFIG_COLS, sort=True).ngroup()
+    configs = players[CONFIG_COLS + ["config"]].drop_duplicates().sort_values("config")
+    df = training_frame(teams, players)
+
+    exclude = set(META_COLS + TARGET_COLS + NAME_COLS)
+    features = [
+        col for col in df.columns
+        if col not in exclude and (pd.api.types.is_numeric_dtype(df[col]) or _is_bool(df[col]))
+    ]
+
+    # written right into the mapped files, so the matrix is never held in memory twice
+    arrays = {
+        "X": np.lib.format.open_memmap(join(path, ARRAY_NAMES["X"]), mode="w+", dtype=dtype,
+                                       shape=(len(df), len(features))),
+        "y": np.lib.format.open_memmap(join(path, ARRAY_NAMES["y"]), mode="w+",
+                                       dtype=np.float64, shape=(len(df), len(TARGET_COLS))),
+        "meta": np.lib.format.open_memmap(join(path, ARRAY_NAMES["meta"]), mode="w+",
+                                          dtype=np.int64, shape=(len(df), len(META_COLS))),
+    }
+    for i, col in enumerate(features):
+        arrays["X"][:, i] = df[col].to_numpy(dtype=dtype)
+    for i, col in enumerate(TARGET_COLS):
+        arrays["y"][:, i] = df[col].to_numpy(dtype=np.float64)
+    for i, col in enumerate(META_COLS):
+        arrays["meta"][:, i] = df[col].to_numpy(dtype=np.int64)
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+    schema = {
+        "rows": len(df),
+        "dtype": np.dtype(dtype).name,
+        "features": features,
+        "targets": TARGET_COLS,
+        "meta": META_COLS,
+        "configs": [[str(value) for value in cfg] for cfg in configs[CONFIG_COLS].values],
+        "events": sorted(int(event_id) for event_id in df["event_id"].unique()),
+    }
+    # schema is written last, so an interrupted build is never loaded
+    tmp_path = join(path, f"{SCHEMA_NAME}.tmp")
+    with open(tmp_path, "w+") as fhandle:
+        json.dump(schema, fhandle, indent=4)
+    os.replace(tmp_path, join(path, SCHEMA_NAME))
+
+    return schema
+
+
+def load_matrix(path: str) -> TrainingMatrix:
+    """
+    Memory-maps matrix saved by `build_matrix`. Arrays are read-only views of
+    the files, so processes training on the same matrix share its pages.
+    """
+    schema_path = join(path, SCHEMA_NAME)
+    assert os.path.exists(schema_path), f"Matrix at '{path}' is not built."
+
+    with open(schema_path, "r") as fhandle:
+        schema = json.load(fhandle)
+
+    arrays = {name: np.load(join(path, fn), mmap_mode="r") for name, fn in ARRAY_NAMES.items()}
+    assert len(arrays["X"]) == schema["rows"], "Matrix does not match its schema."
+    return TrainingMatrix(X=arrays["X"], y=arrays["y"], meta=arrays["meta"], schema=schema)
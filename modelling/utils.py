@@ -1,18 +1,24 @@
 import os
 import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from os.path import join, basename
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
 
 from parsing.common import unstack_features_name
+from parsing.store import DEFAULT_VERSION, Entity, FeatureStore, get_feature_store
 from parsing.team._utils import get_winrate
 from sklearn.base import TransformerMixin
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
 from sklearn.metrics import ndcg_score, mean_absolute_error, mean_squared_error
 
+COMPACT_NAMES = ("teams.pkl", "players.pkl")  # compacted tables of an event
+DATE_COLS = ["start_time", "end_time", "start_at", "ends_at"]
+
 
 def validate(y_true: np.ndarray, y_pred: np.ndarray) -> pd.DataFrame:
     y_pred *= y_true.max() / y_pred.max()
@@ -46,7 +52,60 @@ def _read_json(path: str, df=True, single_row=False, **kwargs) -> pd.DataFrame:
         return content
 
 
-def get_event_dataset(event_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+def _read_features(entity_dir: str, skip=()) -> pd.DataFrame:
+    features_names = os.listdir(entity_dir)
+    features_names = [fn for fn in features_names if (len(fn.split("_")) == 4)]
+    features_names = [fn for fn in features_names if fn not in skip]
+    if len(features_names) == 0:
+        return pd.DataFrame()
+
+    dfs = []
+    for fn in features_names:
+        df = _read_json(join(entity_dir, fn))
+        cfg = unstack_features_name(fn)
+        for k, v in cfg.items():
+            df[k] = v
+
+        dfs.append(df)
+
+    return pd.concat(dfs, axis=0, ignore_index=True).reset_index(drop=True)
+
+
+def _split_features(features: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    if len(features) == 0:
+        return dict()
+
+    groups = features.groupby("entity_id", sort=False)
+    return {str(k): df.drop(columns="entity_id").reset_index(drop=True) for k, df in groups}
+
+
+def _merge_features(stored: pd.DataFrame, entity_dir: str) -> pd.DataFrame:
+    """
+    Features of an entity saved in the store, completed with configs read from
+    files, e.g. of an entity partly migrated to the store.
+    :param stored: rows of the entity queried from the store or None
+    """
+    if stored is None:
+        return _read_features(entity_dir)
+
+    cfg_cols = ["start_time", "end_time", "event_fil", "ranking_fil"]
+    names = set(stored[cfg_cols].astype(str).agg("_".join, axis=1) + ".json")
+    missing = _read_features(entity_dir, skip=names)
+    if len(missing) == 0:
+        return stored
+    return pd.concat([stored, missing], axis=0, ignore_index=True)
+
+
+def get_event_dataset(
+    event_dir: str, store: FeatureStore = None, version: str = DEFAULT_VERSION
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Collects features and targets of teams and players of the event.
+    :param event_dir: directory of the event parsed with save="features"
+    :param store: if passed, features of windows ending at the event start are
+        queried from the store; configs missing from it are read from files
+    :param version: features version queried from the store
+    """
     assert os.path.exists(event_dir), f"Provided path '{event_dir}' does not exist."
 
     event_df = _read_json(join(event_dir, "event.json"), single_row=True)
@@ -58,25 +117,18 @@ def get_event_dataset(event_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
 
     teams = []
     teams_dir = join(event_dir, "teams")
+    team_ids = [team_id for team_id in os.listdir(teams_dir) if team_id.isdigit()]
 
-    for team_id in os.listdir(teams_dir):
-        if not team_id.isdigit():  # local OS files
-            continue
+    # configs missing from the store (e.g. not migrated yet) are read from files
+    team_features, player_features = dict(), dict()
+    if store is not None:
+        starts_at = event_df.loc[0, "start_at"]
+        team_features = store.query(Entity.TEAM, team_ids, end_time=starts_at, version=version)
+        team_features = _split_features(team_features)
 
+    for team_id in team_ids:
         team_dir = join(teams_dir, team_id)
-        features_names = os.listdir(team_dir)
-        features_names = [fn for fn in features_names if (len(fn.split("_")) == 4)]
-
-        team_dfs = []
-        for fn in features_names:
-            team_df = _read_json(join(team_dir, fn))
-            cfg = unstack_features_name(fn)
-            for k, v in cfg.items():
-                team_df[k] = v
-
-            team_dfs.append(team_df)
-
-        team_df = pd.concat(team_dfs, axis=0, ignore_index=True).reset_index(drop=True)
+        team_df = _merge_features(team_features.get(team_id), team_dir)
         for i in range(5):
             team_df[f"player_id_{i + 1}"] = team2player[team_id][i]
 
@@ -94,25 +146,17 @@ def get_event_dataset(event_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
 
     players = []
     players_dir = join(event_dir, "players")
+    player_ids = [player_id for player_id in os.listdir(players_dir) if player_id.isdigit()]
 
-    for player_id in os.listdir(players_dir):
-        if not player_id.isdigit():
-            continue
+    if store is not None:
+        player_features = store.query(
+            Entity.PLAYER, player_ids, end_time=starts_at, version=version
+        )
+        player_features = _split_features(player_features)
 
+    for player_id in player_ids:
         player_dir = join(players_dir, player_id)
-        features_names = os.listdir(player_dir)
-        features_names = [fn for fn in features_names if (len(fn.split("_")) == 4)]
-
-        player_dfs = []
-        for fn in features_names:
-            player_df = _read_json(join(player_dir, fn))
-            cfg = unstack_features_name(fn)
-            for k, v in cfg.items():
-                player_df[k] = v
-
-            player_dfs.append(player_df)
-
-        player_df = pd.concat(player_dfs, axis=0, ignore_index=True).reset_index(drop=True)
+        player_df = _merge_features(player_features.get(player_id), player_dir)
         try:  # TODO: при последующем парсинге, такой ошибки быть не может. LEGACY.
             player_df["team_id"] = int(player2team[player_id])
             player_df["player_name"] = player_id2name[player_id]
@@ -140,19 +184,243 @@ def get_event_dataset(event_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
     return teams_df, players_df
 
 
-def get_dataset(event_dirs: List[str]):
-    teams, players = [], []
-    for event_dir in event_dirs:
-        teams_df, players_df = get_event_dataset(event_dir)
-        teams.append(teams_df)
-        players.append(players_df)
+def _source_mtime(event_dir: str) -> float:
+    """Latest modification time of the JSON tree of the event."""
+    mtime = 0
+    for root, dirs, files in os.walk(event_dir):
+        if root != event_dir:  # compacted files change the event directory itself
+            mtime = max(mtime, os.stat(root).st_mtime)
+        for fn in files:
+            if fn not in COMPACT_NAMES and not fn.endswith(".tmp"):
+                mtime = max(mtime, os.stat(join(root, fn)).st_mtime)
+    return mtime
+
+
+def compact_event_dataset(event_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Collects teams and players tables of the event from the JSON tree and saves
+    each of them into a single file next to it, see `load_event_dataset`.
+    """
+    teams_df, players_df = get_event_dataset(event_dir)
+    try:
+        for df, name in zip((teams_df, players_df), COMPACT_NAMES):
+            tmp_path = join(event_dir, f"{name}.tmp")
+            df.to_pickle(tmp_path)
+            os.replace(tmp_path, join(event_dir, name))  # readers never see a partial file
+    except OSError as ex:  # e.g. read-only dataset, tables are still returned
+        print(f"Event {event_dir} was not compacted: {ex}.")
+
+    return teams_df, players_df
+
+
+def load_event_dataset(event_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Reads teams and players tables of the event from compacted files and
+    rebuilds them from the JSON tree only if any of its files is newer.
+    """
+    paths = [join(event_dir, name) for name in COMPACT_NAMES]
+    if all(os.path.isfile(path) for path in paths):
+        compacted_at = min(os.stat(path).st_mtime for path in paths)
+        if compacted_at >= _source_mtime(event_dir):
+            teams_df, players_df = [pd.read_pickle(path) for path in paths]
+            return teams_df, players_df
+
+    return compact_event_dataset(event_dir)
+
+
+def downcast_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts columns of a dataset frame to compact dtypes without losing values:
+    dates to datetime64, repeated strings to categoricals, Python bools to bool,
+    floats to float32 and integers to int32 where they fit.
+    Categories differ between frames, so downcast after concatenating them.
+    :returns: converted copy of the frame
+    """
+    df = df.copy()
+    for col in df.columns:
+        values = df[col]
+        if col in DATE_COLS:
+            df[col] = pd.to_datetime(values)
+        elif values.dtype == object:
+            notna = values.dropna()
+            if len(notna) == len(values) > 0 and notna.map(type).eq(bool).all():
+                df[col] = values.astype(bool)
+            elif notna.map(type).eq(str).all() and values.nunique() <= len(values) // 2:
+                df[col] = values.astype("category")
+        elif values.dtype == np.float64:
+            downcast = values.astype(np.float32)
+            if np.array_equal(downcast.astype(np.float64), values, equal_nan=True):
+                df[col] = downcast
+        elif values.dtype == np.int64:
+            int32 = np.iinfo(np.int32)
+            if values.between(int32.min, int32.max).all():
+                df[col] = values.astype(np.int32)
+    return df
+
+
+def memory_report(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    :param frames: frames by name, e.g. {"teams": teams, "players": players}
+    :returns: number of rows, columns and memory in megabytes of every frame
+    """
+    report = [
+        {
+            "frame": name,
+            "rows": len(df),
+            "columns": len(df.columns),
+            "memory_mb": df.memory_usage(index=True, deep=True).sum() / 1024**2,
+        }
+        for name, df in frames.items()
+    ]
+    return pd.DataFrame(report).set_index("frame")
+
+
+def _load_event(
+    event_dir: str,
+    store: FeatureStore = None,
+    compact: bool = False,
+    version: str = DEFAULT_VERSION,
+):
+    if store is None and compact:
+        return load_event_dataset(event_dir)
+    return get_event_dataset(event_dir, store=store, version=version)
+
+
+def _load_events(
+    event_dirs: List[str],
+    store: FeatureStore = None,
+    compact: bool = False,
+    workers: int = 1,
+    version: str = DEFAULT_VERSION,
+) -> List[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """Loads events concurrently, tables are returned in the order of `event_dirs`."""
+    if workers == 1 or len(event_dirs) <= 1:
+        return [_load_event(event_dir, store, compact, version) for event_dir in event_dirs]
+
+    # JSON decoding holds the GIL, so events are loaded in processes; the store
+    # connection can not be passed to another process and is shared by threads
+    executor = ProcessPoolExecutor if store is None else ThreadPoolExecutor
+    with executor(max_workers=workers or os.cpu_count()) as pool:
+        load = partial(_load_event, store=store, compact=compact, version=version)
+        return list(pool.map(load, event_dirs))
+
+
+def get_dataset(
+    event_dirs: List[str],
+    store: FeatureStore = None,
+    compact: bool = False,
+    workers: int = 1,
+    downcast: bool = False,
+    version: str = DEFAULT_VERSION,
+):
+    """
+    Collects teams and players tables of all events.
+    :param event_dirs: directories of events
+    :param store: feature store to query features from, see `get_event_dataset`
+    :param compact: reads compacted files of events and writes missing or stale
+        ones next to the JSON tree, see `load_event_dataset`
+    :param workers: number of events loaded concurrently, all cores if None
+    :param downcast: converts columns to compact dtypes, see `downcast_dataset`
+    :param version: features version queried from the store
+    """
+    tables = _load_events(event_dirs, store, compact, workers, version)
+    teams = [teams_df for teams_df, _ in tables]
+    players = [players_df for _, players_df in tables]
 
     teams = pd.concat(teams, axis=0, ignore_index=True).reset_index(drop=True)
     players = pd.concat(players, axis=0, ignore_index=True).reset_index(drop=True)
 
+    if downcast:
+        teams, players = downcast_dataset(teams), downcast_dataset(players)
     return teams, players
 
 
+def _manifest(event_dir: str) -> Tuple[Tuple[str, int, int], ...]:
+    """Pairs (path, mtime, size) of all files of the event's JSON tree."""
+    manifest = []
+    for root, dirs, files in os.walk(event_dir):
+        for fn in files:
+            if fn in COMPACT_NAMES or fn.endswith(".tmp"):
+                continue
+            path = join(root, fn)
+            stat = os.stat(path)
+            manifest.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(manifest))
+
+
+class DatasetBuilder:
+    def __init__(
+        self,
+        store_path: str = None,
+        downcast: bool = False,
+        compact: bool = False,
+        version: str = DEFAULT_VERSION,
+    ):
+        """
+        Keeps tables of loaded events in memory and reloads an event only if
+        the manifest of its files (paths, modification times and sizes) changed.
+        :param store_path: feature store file to read features from once it exists
+        :param downcast: converts columns to compact dtypes, see `downcast_dataset`
+        :param compact: reads and writes compacted files of events, see `get_dataset`
+        :param version: features version queried from the store
+        """
+        self.store_path = store_path
+        self.downcast = downcast
+        self.compact = compact
+        self.version = version
+        self._events: Dict[str, Tuple[tuple, pd.DataFrame, pd.DataFrame]] = dict()
+        self._dataset: Tuple[tuple, pd.DataFrame, pd.DataFrame] = None
+
+    def _store(self) -> Tuple[FeatureStore, tuple]:
+        if self.store_path is None or not os.path.isfile(self.store_path):
+            return None, ()
+        stat = os.stat(self.store_path)
+        return get_feature_store(self.store_path), (stat.st_mtime_ns, stat.st_size)
+
+    def _changed(self, event_dirs: List[str]) -> Tuple[FeatureStore, Dict[str, tuple]]:
+        """:returns: store and manifests of events not loaded with them yet"""
+        store, store_state = self._store()
+        changed = dict()
+        for event_dir in event_dirs:
+            manifest = (_manifest(event_dir), store_state)
+            cached = self._events.get(event_dir)
+            if cached is None or cached[0] != manifest:
+                changed[event_dir] = manifest
+        return store, changed
+
+    def get_event_dataset(self, event_dir: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        self._update([event_dir])
+        _, teams_df, players_df = self._events[event_dir]
+        return teams_df.copy(), players_df.copy()
+
+    def _update(self, event_dirs: List[str], workers: int = 1):
+        store, changed = self._changed(event_dirs)
+        tables = _load_events(list(changed), store, self.compact, workers, self.version)
+        for (event_dir, manifest), (teams_df, players_df) in zip(changed.items(), tables):
+            self._events[event_dir] = (manifest, teams_df, players_df)
+
+    def get_dataset(
+        self, event_dirs: List[str], workers: int = 1
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Same as `get_dataset`, but events that have not changed since the
+        previous call are not read again. Returned frames are copies.
+        :param workers: number of changed events loaded concurrently
+        """
+        self._update(event_dirs, workers)
+        key = tuple((event_dir, self._events[event_dir][0]) for event_dir in event_dirs)
+
+        if self._dataset is None or self._dataset[0] != key:
+            tables = [self._events[event_dir][1:] for event_dir in event_dirs]
+            teams = pd.concat([t for t, _ in tables], axis=0, ignore_index=True)
+            players = pd.concat([p for _, p in tables], axis=0, ignore_index=True)
+            if self.downcast:
+                teams, players = downcast_dataset(teams), downcast_dataset(players)
+            self._dataset = (key, teams, players)
+
+        return self._dataset[1].copy(), self._dataset[2].copy()
+
+
 def get_target(pts: float, wr: float) -> float:
     return pts + 9 * wr - 3
 
@@ -0,0 +1,256 @@
+import mmap
+import os
+import struct
+import threading
+import zlib
+from os.path import join
+from typing import Dict, Iterator, Optional, Tuple
+
+from parsing.common import FantasyError
+
+ARCHIVE_NAME = "pages.arc"
+
+# record: magic, name length, data length, then name (utf-8) and zlib-compressed page
+_HEADER = struct.Struct("<4sHI")
+_MAGIC = b"PGA1"
+
+
+class PageArchive:
+    def __init__(self, path: str, writable: bool = True):
+        """
+        Single-file, append-only archive of compressed pages with an offset index.
+        Pages are addressed by their name (path relative to the archive root)
+        and read through a memory map without unpacking the archive.
+        :param path: archive file path
+        :param writable: opens archive for appending
+        """
+        self.path = path
+        self.writable = writable
+
+        self._index: Dict[str, Tuple[int, int]] = dict()
+        self._lock = threading.Lock()
+        self._map: Optional[mmap.mmap] = None
+        self._mapped_size = 0
+
+        if writable:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._file = open(path, "a+b")
+        else:
+            self._file = open(path, "rb")
+        self._scan()
+
+    def _remap(self):
+        size = os.fstat(self._file.fileno()).st_size
+        if size == self._mapped_size:
+            return
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        if size > 0:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped_size = size
+
+    def _scan(self):
+        """Rebuilds the index from record headers, dropping a torn last record."""
+        self._remap()
+        offset = 0
+        while offset + _HEADER.size <= self._mapped_size:
+            magic, name_len, data_len = _HEADER.unpack_from(self._map, offset)
+            end = offset + _HEADER.size + name_len + data_len
+            if magic != _MAGIC or end > self._mapped_size:
+                break
+            name_start = offset + _HEADER.size
+            name = self._map[name_start : name_start + name_len].decode("utf-8")
+            self._index[name] = (name_start + name_len, data_len)
+            offset = end
+
+        if offset != self._mapped_size and self.writable:
+            print(f"Archive {self.path} has a torn record at {offset}, truncating.")
+            self._file.truncate(offset)
+            self._remap()
+
+    def put(self, name: str, page: str):
+        """
+        Appends page to the archive, replacing a page with the same name.
+        :param name: page name
+        :param page: page source
+        """
+        if not self.writable:
+            raise FantasyError.invalid_arguments(f"archive {self.path} is read-only")
+
+        name_bytes = name.encode("utf-8")
+        data = zlib.compress(page.encode("utf-8"))
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(_HEADER.pack(_MAGIC, len(name_bytes), len(data)))
+            self._file.write(name_bytes)
+            self._file.write(data)
+            self._file.flush()
+            self._index[name] = (offset + _HEADER.size + len(name_bytes), len(data))
+
+    def get(self, name: str) -> Optional[str]:
+        """:returns: page source or None if page is not archived"""
+        with self._lock:
+            entry = self._index.get(name)
+            if entry is None:
+                return None
+            offset, length = entry
+            if offset + length > self._mapped_size:
+                self._remap()
+            data = self._map[offset : offset + length]
+        return zlib.decompress(data).decode("utf-8")
+
+    def names(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._index))
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._file.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_registered: Dict[str, PageArchive] = dict()  # root -> archive pages are written to
+# archive path -> read-only archive and (size, mtime) of the file it was opened at
+_discovered: Dict[str, Tuple[PageArchive, Tuple[int, int]]] = dict()
+_lookups: Dict[str, Optional[str]] = dict()  # page directory -> root of its archive
+_registry_lock = threading.Lock()
+
+MAX_ARCHIVE_DEPTH = 4  # page files lie at most this deep below an event directory
+
+
+def register_archive(root: str) -> PageArchive:
+    """
+    Redirects pages saved under `root` into `root/ARCHIVE_NAME`.
+    :param root: event directory
+    :returns: archive
+    """
+    root = os.path.abspath(root)
+    with _registry_lock:
+        if root not in _registered:
+            path = join(root, ARCHIVE_NAME)
+            discovered = _discovered.pop(path, None)
+            if discovered is not None:
+                discovered[0].close()
+            _registered[root] = PageArchive(path, writable=True)
+            _lookups.clear()
+        return _registered[root]
+
+
+def unregister_archive(root: str):
+    with _registry_lock:
+        archive = _registered.pop(os.path.abspath(root), None)
+        _lookups.clear()
+    if archive is not None:
+        archive.close()
+
+
+def _find_root(directory: str) -> Optional[str]:
+    """:returns: closest parent directory with a registered or saved archive"""
+    root = directory
+    for _ in range(MAX_ARCHIVE_DEPTH):
+        if root in _registered or os.path.isfile(join(root, ARCHIVE_NAME)):
+            return root
+
+        parent = os.path.dirname(root)
+        if parent == root:
+            break
+        root = parent
+
+    return None
+
+
+def _open_discovered(path: str) -> Optional[PageArchive]:
+    """:returns: read-only archive, reopened if the file changed since it was opened"""
+    try:
+        stat = os.stat(path)
+        version = (stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        version = None
+
+    discovered = _discovered.get(path)
+    if discovered is not None and discovered[1] == version:
+        return discovered[0]
+
+    # replaced archive is not closed, readers may still hold it
+    _discovered.pop(path, None)
+    if version is None:
+        return None
+    archive = PageArchive(path, writable=False)
+    _discovered[path] = (archive, version)
+    return archive
+
+
+def find_archive(path: str) -> Optional[Tuple[PageArchive, str]]:
+    """
+    Looks for an archive holding the page, registered or lying in a parent directory.
+    Archive of a directory is looked up once, until archives are (un)registered.
+    :param path: path the page would have as a separate file
+    :returns: archive and page name in it
+    """
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    with _registry_lock:
+        if directory not in _lookups:
+            _lookups[directory] = _find_root(directory)
+        root = _lookups[directory]
+        if root is None:
+            return None
+
+        name = os.path.relpath(path, root).replace(os.sep, "/")
+        if root in _registered:
+            return _registered[root], name
+
+        archive = _open_discovered(join(root, ARCHIVE_NAME))
+        if archive is None:  # archive was removed
+            del _lookups[directory]
+            return None
+        return archive, name
+
+
+def save_page(path: str, page: str):
+    """Saves page into a registered archive or as a separate file."""
+    found = find_archive(path)
+    if found is not None and found[0].writable:
+        archive, name = found
+        archive.put(name, page)
+        return
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fhandle:
+        fhandle.write(page)
+
+
+def page_exists(path: str) -> bool:
+    if os.path.isfile(path):
+        return True
+    found = find_archive(path)
+    return found is not None and found[1] in found[0]
+
+
+def read_page(path: str) -> Optional[str]:
+    """:returns: page saved with `save_page` or None if it does not exist"""
+    if os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as fhandle:
+            return fhandle.read()
+
+    found = find_archive(path)
+    if found is None:
+        return None
+    archive, name = found
+    return archive.get(name)
@@ -1,17 +1,69 @@
 import time
-import os
+import threading
 from pathlib import Path
 from os.path import join
-from typing import Dict
-from datetime import date, datetime, timedelta as td
+from typing import Dict, Optional, Tuple
+from datetime import date, datetime
 
 from enum import Enum
 from dataclasses import dataclass
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer, Tag
 
 BASE = "https://www.hltv.org"
 TIMEOUT = 2
 
+HTML_PARSERS = ("html.parser", "lxml", "html5lib")
+_html_parser = "html.parser"
+
+
+def set_html_parser(name: str):
+    """
+    Selects tree builder used by all extractors, e.g. C-backed "lxml".
+    :param name: one of HTML_PARSERS, must be installed
+    """
+    global _html_parser
+    if name not in HTML_PARSERS:
+        raise FantasyError.invalid_arguments(f"unknown parser {name}")
+    try:
+        BeautifulSoup("", name)
+    except FeatureNotFound:
+        raise FantasyError.invalid_arguments(f"parser {name} is not installed")
+    _html_parser = name
+
+
+def get_html_parser() -> str:
+    return _html_parser
+
+
+def make_soup(page_source: str, parse_only: SoupStrainer = None) -> BeautifulSoup:
+    """
+    Builds parsed tree with the selected parser.
+    :param page_source: HTML page
+    :param parse_only: optional strainer restricting tree to needed fragments
+    :returns: parsed tree
+    """
+    return BeautifulSoup(page_source, _html_parser, parse_only=parse_only)
+
+
+def page_strainer(*fragments: Tuple[str, str]) -> SoupStrainer:
+    """
+    Builds strainer keeping only top-level fragments an extractor needs.
+    Tags and classes are matched independently, so the tree may keep a bit more.
+    :param fragments: pairs (tag name, one of tag's classes)
+    :returns: strainer to pass as `parse_only` into `make_soup`
+    """
+    names = sorted({name for name, _ in fragments})
+    classes = {cls for _, cls in fragments}
+
+    def match_class(value):
+        if value is None:
+            return False
+        if isinstance(value, str):
+            value = value.split()
+        return any(cls in classes for cls in value)
+
+    return SoupStrainer(names, class_=match_class)
+
 
 def set_timeout(timeout: float):
     """Controls the frequency of calling parsing functions."""
@@ -32,6 +84,48 @@ def set_timeout(timeout: float):
     return decorator
 
 
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        Thread-safe token bucket shared by all callers hitting the same host.
+        :param rate: tokens (requests) added per second
+        :param capacity: maximum burst size
+        """
+        if rate <= 0 or capacity < 1:
+            raise FantasyError.invalid_arguments(f"rate={rate}, capacity={capacity}")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1):
+        """Blocks until requested number of tokens is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            # tokens are reserved right away, so waiters are served in order
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def set_rate(self, rate: float):
+        """Changes refill rate, used to slow the crawl down adaptively."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self.rate = rate
+
+
 class EventFilter(Enum):
     """Filter for tournaments tier differentiating."""
 
@@ -57,6 +151,13 @@ class RankingFilter(Enum):
     def __str__(self):
         return self.value
 
+    @property
+    def top(self) -> Optional[int]:
+        """Worst world ranking of opponents passing the filter, None for ALL."""
+        if self == RankingFilter.ALL:
+            return None
+        return int(self.value[len("Top") :])
+
 
 class Ranking(Enum):
     """Identifier for HLTV ranking pages."""
@@ -66,6 +167,11 @@ class Ranking(Enum):
     def __str__(self):
         return self.value
 
+    @property
+    def markers(self):
+        """HTML fragments any valid page of this type contains."""
+        return ("ranked-team",)
+
 
 @dataclass
 class Config:
@@ -75,6 +181,10 @@ class Config:
     ranking_fil: RankingFilter
 
 
+class FetchError(ValueError):
+    """Page could not be loaded or is a throttling/challenge page; worth retrying."""
+
+
 class FantasyError:
 
     @staticmethod
@@ -97,6 +207,10 @@ class FantasyError:
     def something_went_wrong(msg: str = ""):
         return ValueError(f"Unexpected behaviour: {msg}")
 
+    @staticmethod
+    def fetch_failed(msg: str = ""):
+        return FetchError(f"Page was not loaded: {msg}")
+
 
 def get_page_name(page_type: str, cfg: Config) -> str:
     """
@@ -130,32 +244,20 @@ def unstack_features_name(features_name: str) -> Dict[str, str]:
 
 
 def get_ranking_page(cfg: Config, rankings_path) -> str:
-    if not os.path.isdir(rankings_path):
-        raise FantasyError.invalid_arguments(f"not such path {rankings_path}")
-
-    rankings = os.listdir(rankings_path)
-
-    end = cfg.end_time
-
-    cnt = 0
-    while f"{end}.html" not in rankings:
-        end -= td(days=1)
-        cnt += 1
+    from parsing.ranking import get_ranking_store  # ranking depends on this module
 
-        if cnt > 7:
-            raise FantasyError.no_data(f"For given date {end} no close ranking is found.")
-
-    return f"{end}.html"
+    store = get_ranking_store(rankings_path)
+    return f"{store.snapshot_date(cfg.end_time)}.html"
 
 
 def _read_path(path: str):
-    if not os.path.isfile(path):
-        raise FantasyError.invalid_arguments(f"Not found {path}")
+    from parsing.archive import read_page  # archive module depends on this one
 
-    with open(path, "r", encoding="utf-8") as f:
-        page_source = f.read()
+    page_source = read_page(path)
+    if page_source is None:
+        raise FantasyError.invalid_arguments(f"Not found {path}")
 
-    return BeautifulSoup(page_source, "html.parser")
+    return make_soup(page_source)
 
 
 def _get_src(path: str = None, src: Tag = None):
@@ -1,14 +1,16 @@
 from typing import List
 from parsing.team import Team
-from bs4 import BeautifulSoup
+from parsing.common import make_soup
+from parsing.fetch import get_cache
 
 
 class Event:
 
-    def __init__(self, key: int):
+    def __init__(self, key: int, page_source: str = None):
         """
         Class implements methods to parse data regarding an event.
         :param key: event's HLTV id
+        :param page_source: stored main page, loaded if not specified
         """
 
         self.key = key
@@ -24,10 +26,16 @@ class Event:
 
         self.teams: List[Team] = []
 
-        page_data = self.get_page(return_page=True)
-        src = BeautifulSoup(page_data, "html.parser")
+        self.page_source = page_source
+        self.page_source = self.get_page(return_page=True)
+        src = make_soup(self.page_source)
         self.extract_main_page(path=None, src=src)
 
+        # main page of a finished event never changes, see `is_closed_window`
+        cache = get_cache()
+        if cache is not None and self.ends_at is not None:
+            cache.close_window(self.get_event_link(), self.ends_at.date())
+
     def features_to_dict(self):
         return {
             "is_lan": self.is_lan,
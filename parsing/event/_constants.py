@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class EventPage(Enum):
+    OVERVIEW = "event"  # for API consistency
+
+    def __str__(self):
+        return self.value
+
+    @property
+    def markers(self):
+        """HTML fragments any valid page of this type contains."""
+        return ("eventMeta",)
@@ -1,6 +1,6 @@
-import os
-
-from selenium import webdriver
+from parsing.archive import save_page
+from parsing.event._constants import EventPage
+from parsing.fetch import fetch
 
 
 def get_page(self, path: str = None, return_page: bool = False):
@@ -10,12 +10,12 @@ def get_page(self, path: str = None, return_page: bool = False):
     :param return_page: returns page if True
     """
 
-    dr = webdriver.Chrome()
-    link = self.get_event_link()
-    dr.get(link)
+    page_source = getattr(self, "page_source", None)
+    if page_source is None:  # loaded once per object
+        link = self.get_event_link()
+        page_source = fetch(link, EventPage.OVERVIEW)
+
     if path:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(dr.page_source)
+        save_page(path, page_source)
     if return_page:
-        return dr.page_source
+        return page_source
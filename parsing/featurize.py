@@ -0,0 +1,313 @@
+"""
+Rebuilds features and targets of events from pages stored by
+`parse_event_pages(save="html")`, without loading anything from HLTV.
+
+Usage (from the repository root):
+    python3 -m parsing.featurize data/events 7755 --config 90 ALL Top30 \
+        --config 60 Lan Top20 --rankings data/rankings
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta as td
+from os.path import join
+from typing import Any, Dict, List, Optional, Tuple
+
+from bs4 import Tag
+from parsing.archive import read_page
+from parsing.common import (
+    Config,
+    EventFilter,
+    FantasyError,
+    RankingFilter,
+    get_features_name,
+    get_html_parser,
+    get_page_name,
+    get_ranking_page,
+    make_soup,
+    set_html_parser,
+)
+from parsing.event import Event
+from parsing.parser import (
+    FEATURES_VERSION,
+    PLAYER_FEATURE_PAGES,
+    RANKING_PATH,
+    TARGET_NAME,
+    TEAM_FEATURE_PAGES,
+    _player_features,
+    _store_features,
+    _team_stats,
+    _write_meta,
+    _write_team_features,
+)
+from parsing.player import PlayerStat
+from parsing.ranking import get_ranking_index
+from parsing.store import FeatureStore, get_feature_store
+from parsing.team import Team, TeamStat
+from parsing.team._features import FEATURES
+
+
+def _read_soup(path: str, page_type: Any) -> Optional[Tag]:
+    page = read_page(path)
+    if page is None:
+        print(f"Page {path} is not stored.")
+        return None
+    return make_soup(page, page_type.strainer)
+
+
+def _read_event(pages_dir: str, event_key: int) -> Event:
+    page_source = read_page(join(pages_dir, "overview.html"))
+    if page_source is None:
+        raise FantasyError.no_data(f"overview page of event {event_key} not found")
+    return Event(event_key, page_source=page_source)
+
+
+def _featurize_team(
+    pages_dir: str,
+    event_dir: str,
+    team: Team,
+    rankings: List[Tuple[Config, str]],
+    target_cfg: Config,
+) -> Tuple[Team, Dict[str, Dict[str, Any]], int]:
+    """
+    Calculates features of players for every config and targets, and collects
+    team stats to calculate features of all teams in a batch.
+    Runs in a worker process, so the team is returned with its final players.
+    :returns: team, pairs (features path, team stats) and number of outputs
+        skipped because of missing pages
+    """
+    team_pages = join(pages_dir, "teams", str(team.key))
+    team_dir = join(event_dir, "teams", str(team.key))
+    players_pages = join(pages_dir, "players")
+    players_dir = join(event_dir, "players")
+    team_stats = dict()
+    skipped = 0
+
+    lineups = _read_soup(join(team_pages, "lineup.html"), TeamStat.LINEUPS)
+    if lineups is None:
+        return team, team_stats, 1
+    team.init_lineups(path=None, src=lineups)
+    if len(team.players) == 0:
+        return team, team_stats, 0
+
+    os.makedirs(team_dir, exist_ok=True)
+    for cfg, ranking_path in rankings:
+        features_name = get_features_name(cfg)
+        pages = dict()
+        for page_name, page_type in TEAM_FEATURE_PAGES.items():
+            # lineups of the config, "lineup.html" only lists the current players
+            path = join(team_pages, get_page_name(str(page_type), cfg))
+            pages[page_name] = _read_soup(path, page_type)
+        if any(src is None for src in pages.values()):
+            skipped += 1
+            continue
+
+        ranking_index = get_ranking_index(ranking_path)
+        stats = _team_stats(team, pages, cfg, ranking_index)
+        team_stats[join(team_dir, features_name)] = stats
+
+        for player in list(team.players):
+            pages = dict()
+            for page_name, page_type in PLAYER_FEATURE_PAGES.items():
+                path = join(
+                    players_pages,
+                    str(player.key),
+                    get_page_name(str(page_type), cfg),
+                )
+                pages[page_name] = _read_soup(path, page_type)
+            if any(src is None for src in pages.values()):
+                skipped += 1
+                continue
+
+            features = _player_features(player, pages)
+            player_dir = join(players_dir, str(player.key))
+            os.makedirs(player_dir, exist_ok=True)
+            with open(
+                join(player_dir, features_name), "w+", encoding="utf-8"
+            ) as fhandle:
+                json.dump(features, fhandle, indent=4, default=str)
+
+    # TARGETS
+    path = join(team_pages, get_page_name(str(TeamStat.MATCHES), target_cfg))
+    src = _read_soup(path, TeamStat.MATCHES)
+    if src is None:
+        skipped += 1
+    else:
+        matches = team.get_target(path=None, src=src)
+        with open(join(team_dir, TARGET_NAME), "w+", encoding="utf-8") as fhandle:
+            json.dump(matches, fhandle, indent=4, default=str)
+
+    for player in team.players:
+        page_name = get_page_name(str(PlayerStat.MATCHES), target_cfg)
+        src = _read_soup(
+            join(players_pages, str(player.key), page_name), PlayerStat.MATCHES
+        )
+        if src is None:
+            skipped += 1
+            continue
+
+        matches = player.extract_matches_stats(path=None, src=src)
+        player_dir = join(players_dir, str(player.key))
+        os.makedirs(player_dir, exist_ok=True)
+        with open(join(player_dir, TARGET_NAME), "w+", encoding="utf-8") as fhandle:
+            json.dump(player.calculate_target(matches), fhandle, indent=4, default=str)
+
+    return team, team_stats, skipped
+
+
+def featurize_event_pages(
+    event_key: int,
+    cfgs: List[Config],
+    pages_path: str,
+    path: str = None,
+    rankings_path: str = RANKING_PATH,
+    workers: int = None,
+    store: FeatureStore = None,
+    event: Event = None,
+    version: str = FEATURES_VERSION,
+) -> Event:
+    """
+    Extracts stats from stored pages of an event and writes the same features,
+    targets and META files as `parse_event_pages(save="features")`.
+    Existing outputs are overwritten, so changed features need no recrawl.
+    :param event_key: event's HLTV id
+    :param cfgs: list of filters the pages were parsed with
+    :param pages_path: directory passed to `parse_event_pages(save="html")`
+    :param path: directory to save features to, `pages_path` if not specified
+    :param rankings_path: directory with ranking pages
+    :param workers: number of processes, all cores if not specified
+    :param store: feature store to save rebuilt features into
+    :param event: event read from the stored overview page, read if not passed
+    :param version: version of team features, see `FEATURES`
+    :return: event object
+    """
+    FEATURES.features(version)  # unknown versions fail before reading pages
+    pages_dir = join(pages_path, str(event_key))
+    event_dir = join(path or pages_path, str(event_key))
+
+    if event is None:
+        event = _read_event(pages_dir, event_key)
+
+    os.makedirs(event_dir, exist_ok=True)
+    with open(join(event_dir, "event.json"), "w+") as fhandle:
+        json.dump(event.features_to_dict(), fhandle, indent=4, default=str)
+
+    rankings = []
+    for cfg in cfgs:
+        ranking = get_ranking_page(cfg, rankings_path=rankings_path)
+        rankings.append((cfg, join(rankings_path, ranking)))
+
+    target_cfg = Config(
+        start_time=event.starts_at,
+        end_time=event.ends_at,
+        event_fil=EventFilter.ALL,
+        ranking_fil=RankingFilter.ALL,
+    )
+    args = (pages_dir, event_dir)
+
+    results, errors = [], []
+    if workers == 1:
+        for team in event.teams:
+            try:
+                results.append(_featurize_team(*args, team, rankings, target_cfg))
+            except Exception as ex:
+                errors.append((team, ex))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            initializer=set_html_parser,
+            initargs=(get_html_parser(),),
+        ) as executor:
+            futures = [
+                executor.submit(_featurize_team, *args, team, rankings, target_cfg)
+                for team in event.teams
+            ]
+            for team, future in zip(event.teams, futures):
+                try:
+                    results.append(future.result())
+                except Exception as ex:
+                    errors.append((team, ex))
+
+    # features of the teams that succeeded are saved even if others failed
+    team_stats = dict()
+    for _, stats, _ in results:
+        team_stats.update(stats)
+    _write_team_features(team_stats, version)
+    if store is not None:
+        teams = [team for team, _, _ in results]
+        _store_features(store, teams, cfgs, event_dir, version)
+    if len(errors) > 0:
+        print(
+            f"Features of {len(errors)} teams failed: {[team for team, _ in errors]}."
+        )
+        raise errors[0][1]
+
+    event.teams = [team for team, _, _ in results]
+    _write_meta(event_dir, event.teams)
+
+    skipped = sum(count for _, _, count in results)
+    print(f"Featurized {event}: {len(event.teams)} teams, {skipped} outputs skipped.")
+    return event
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__)
+    args.add_argument("pages_path", help="directory with stored events")
+    args.add_argument("event_keys", nargs="+", type=int, help="HLTV ids of events")
+    args.add_argument(
+        "--config",
+        nargs=3,
+        action="append",
+        required=True,
+        metavar=("DAYS", "EVENT_FILTER", "RANKING_FILTER"),
+        help="window of DAYS before event start with filters, e.g. 90 ALL Top30",
+    )
+    args.add_argument("--out", default=None, help="directory to save features to")
+    args.add_argument("--rankings", default=RANKING_PATH, help="ranking pages")
+    args.add_argument("--workers", type=int, default=None, help="processes")
+    args.add_argument("--html-parser", default=None, help="e.g. lxml")
+    args.add_argument("--store", default=None, help="feature store file")
+    args.add_argument(
+        "--version", default=FEATURES_VERSION, help="version of team features"
+    )
+    args = args.parse_args()
+
+    if args.html_parser:
+        set_html_parser(args.html_parser)
+    store = get_feature_store(args.store) if args.store else None
+
+    for event_key in args.event_keys:
+        try:
+            event = _read_event(join(args.pages_path, str(event_key)), event_key)
+        except ValueError:
+            print(f"Event {event_key} is not stored.")
+            continue
+
+        # pages are named by dates, as in `collect_dataset.ipynb`
+        starts_at = event.starts_at.date()
+        cfgs = [
+            Config(
+                start_time=starts_at - td(days=int(days)),
+                end_time=starts_at,
+                event_fil=EventFilter(event_fil),
+                ranking_fil=RankingFilter(ranking_fil),
+            )
+            for days, event_fil, ranking_fil in args.config
+        ]
+        featurize_event_pages(
+            event_key,
+            cfgs,
+            args.pages_path,
+            path=args.out,
+            rankings_path=args.rankings,
+            workers=args.workers,
+            store=store,
+            event=event,
+            version=args.version,
+        )
+
+
+if __name__ == "__main__":
+    main()
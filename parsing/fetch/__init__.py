@@ -0,0 +1,45 @@
+from parsing.fetch._backend import (
+    FetchBackend,
+    HttpBackend,
+    SeleniumBackend,
+    fetch,
+    get_backend,
+    get_cache,
+    get_circuit_breaker,
+    get_rate_limiter,
+    set_backend,
+    set_cache,
+    set_rate_limit,
+    set_retry_policy,
+)
+from parsing.fetch._cache import PageCache, is_closed_window, window_end
+from parsing.fetch._pool import DriverPool, configure_driver_pool, get_driver_pool
+from parsing.fetch._scheduler import CrawlScheduler
+from parsing.fetch._plan import CrawlPlan
+from parsing.fetch._retry import CircuitBreaker, RetryPolicy, validate_page
+
+__all__ = [
+    "FetchBackend",
+    "HttpBackend",
+    "SeleniumBackend",
+    "fetch",
+    "get_backend",
+    "get_cache",
+    "get_circuit_breaker",
+    "get_rate_limiter",
+    "set_backend",
+    "set_cache",
+    "set_rate_limit",
+    "set_retry_policy",
+    "PageCache",
+    "is_closed_window",
+    "window_end",
+    "DriverPool",
+    "configure_driver_pool",
+    "get_driver_pool",
+    "CrawlScheduler",
+    "CrawlPlan",
+    "CircuitBreaker",
+    "RetryPolicy",
+    "validate_page",
+]
@@ -0,0 +1,253 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from parsing.common import BASE, TIMEOUT, FantasyError, FetchError, TokenBucket
+from parsing.fetch._cache import PageCache
+from parsing.fetch._pool import DriverPool, get_driver_pool
+from parsing.fetch._retry import (
+    CircuitBreaker,
+    RetryPolicy,
+    validate_page,
+)
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import WebDriverException
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/121.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+RETRY_STATUSES = (403, 429, 500, 502, 503, 504)
+
+
+class FetchBackend:
+    def __init__(self, base: str = None):
+        """
+        Interface of a page fetcher.
+        :param base: optional host replacing HLTV one (e.g. local stand-in server)
+        """
+        self.base = base
+
+    def resolve(self, link: str) -> str:
+        """:returns: link with HLTV host replaced by `base` if specified"""
+        if self.base is not None and link.startswith(BASE):
+            return self.base.rstrip("/") + link[len(BASE) :]
+        return link
+
+    def fetch(self, link: str) -> str:
+        """
+        Method loads the page.
+        :param link: page URL built by `get_*_link` methods
+        :returns: page source
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SeleniumBackend(FetchBackend):
+    def __init__(self, pool: DriverPool = None, base: str = None):
+        """
+        Fetches pages with a browser, required for pages rendered by scripts.
+        :param pool: driver pool, shared one is used by default
+        :param base: optional host replacing HLTV one
+        """
+        super().__init__(base=base)
+        self.pool = pool
+
+    def fetch(self, link: str) -> str:
+        pool = self.pool if self.pool is not None else get_driver_pool()
+        try:
+            with pool.driver() as dr:
+                dr.get(self.resolve(link))
+                return dr.page_source
+        except WebDriverException as ex:
+            raise FantasyError.fetch_failed(f"{ex.msg} for {link}")
+
+
+class HttpBackend(FetchBackend):
+    def __init__(
+        self,
+        headers: Dict[str, str] = None,
+        timeout: float = 30,
+        pool_size: int = 10,
+        base: str = None,
+    ):
+        """
+        Fetches static pages with plain HTTP over keep-alive connections.
+        :param headers: headers overriding `DEFAULT_HEADERS`
+        :param timeout: request timeout in seconds
+        :param pool_size: number of kept-alive connections per host
+        :param base: optional host replacing HLTV one
+        """
+        super().__init__(base=base)
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        # sessions are not thread-safe, so each thread keeps its own one
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_size, pool_maxsize=self.pool_size
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
+
+    def fetch(self, link: str) -> str:
+        try:
+            response = self.session.get(self.resolve(link), timeout=self.timeout)
+        except requests.RequestException as ex:
+            raise FantasyError.fetch_failed(f"{ex} for {link}")
+
+        status = response.status_code
+        if status in RETRY_STATUSES:
+            raise FantasyError.fetch_failed(f"status {status} for {link}")
+        if status != 200:
+            raise FantasyError.no_data(f"status {status} for {link}")
+        return response.text
+
+    def close(self):
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            session.close()
+            self._local.session = None
+
+
+_default_backend: FetchBackend = SeleniumBackend()
+_backends: Dict[Any, FetchBackend] = dict()
+_cache: Optional[PageCache] = None
+_limiters: Dict[str, TokenBucket] = {
+    urlparse(BASE).netloc: TokenBucket(rate=1 / TIMEOUT)
+}
+_breakers: Dict[str, CircuitBreaker] = dict()
+_breakers_lock = threading.Lock()
+_retry_policy = RetryPolicy()
+
+
+def set_backend(backend: FetchBackend, *page_types):
+    """
+    Selects backend for given page types or the default one if none passed.
+    :param backend: backend to use
+    :param page_types: `TeamStat`, `TeamProfile`, `Ranking`, `PlayerStat` or `EventPage` values
+    """
+    global _default_backend
+    if len(page_types) == 0:
+        _default_backend = backend
+    for page_type in page_types:
+        _backends[page_type] = backend
+
+
+def get_backend(page_type: Optional[Any] = None) -> FetchBackend:
+    """:returns: backend selected for the page type"""
+    return _backends.get(page_type, _default_backend)
+
+
+def set_cache(cache: Optional[PageCache]):
+    """Sets page cache consulted by `fetch`, None disables caching."""
+    global _cache
+    _cache = cache
+
+
+def get_cache() -> Optional[PageCache]:
+    return _cache
+
+
+def set_rate_limit(host: str, rate: float, capacity: float = 1):
+    """
+    Limits rate of page loads from a host across all threads.
+    :param host: network location, e.g. "www.hltv.org"
+    :param rate: page loads per second
+    :param capacity: maximum burst size
+    """
+    _limiters[host] = TokenBucket(rate=rate, capacity=capacity)
+    with _breakers_lock:
+        _breakers.pop(host, None)
+
+
+def get_rate_limiter(link: str) -> Optional[TokenBucket]:
+    """:returns: limiter shared by all links to the same host"""
+    return _limiters.get(urlparse(link).netloc)
+
+
+def get_circuit_breaker(link: str) -> CircuitBreaker:
+    """:returns: breaker shared by all links to the same host"""
+    host = urlparse(link).netloc
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(limiter=_limiters.get(host))
+        return _breakers[host]
+
+
+def set_retry_policy(policy: RetryPolicy):
+    global _retry_policy
+    _retry_policy = policy
+
+
+def _load(link: str, page_type: Optional[Any]) -> str:
+    """Loads and validates page, backing off and retrying on failures."""
+    limiter = get_rate_limiter(link)
+    breaker = get_circuit_breaker(link)
+    policy = _retry_policy
+
+    for attempt in range(policy.attempts):
+        breaker.wait()
+        if limiter is not None:
+            limiter.acquire()
+
+        try:
+            page = get_backend(page_type).fetch(link)
+            reason = validate_page(page, page_type)
+        except FetchError as ex:
+            page, reason = None, str(ex)
+
+        if reason is None:
+            breaker.record(True)
+            return page
+
+        breaker.record(False)
+        # invalid pages are never returned, so they are neither cached nor extracted
+        if attempt == policy.attempts - 1:
+            raise FantasyError.fetch_failed(
+                f"{reason} after {policy.attempts} attempts"
+            )
+
+        delay = policy.delay(attempt)
+        print(f"fetch: {reason} for {link}, retrying in {delay:.1f}s.")
+        time.sleep(delay)
+
+
+def fetch(link: str, page_type: Optional[Any] = None, refresh: bool = False) -> str:
+    """
+    Loads page with a backend selected for its type, going through the cache.
+    :param link: page URL
+    :param page_type: type of the page
+    :param refresh: skips cache lookup, the loaded page still replaces cached one
+    :returns: page source
+    """
+    cache = _cache
+    if cache is not None and not refresh:
+        page = cache.get(link)
+        if page is not None:
+            return page
+
+    page = _load(link, page_type)
+    if cache is not None:
+        cache.put(link, page)
+    return page
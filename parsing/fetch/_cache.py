@@ -0,0 +1,221 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from os.path import join
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_MAX_SIZE = 2 * 1024**3  # bytes of compressed pages on disk
+DEFAULT_TTL = 24 * 3600  # seconds, applies to open-window pages only
+
+
+def window_end(link: str) -> Optional[date]:
+    """:returns: last day covered by the page or None if it is not time-bounded"""
+    url = urlparse(link)
+    end = parse_qs(url.query).get("endDate")
+    if end is not None:  # datetime bounds are passed as "%Y-%m-%d %H:%M:%S"
+        return datetime.strptime(end[0][:10], "%Y-%m-%d").date()
+
+    ranking = re.search(r"/ranking/\w+/(\d{4})/([a-z]+)/(\d+)", url.path)
+    if ranking is not None:
+        return datetime.strptime(" ".join(ranking.groups()), "%Y %B %d").date()
+
+    return None
+
+
+def is_closed_window(link: str, at: date = None) -> bool:
+    """
+    Pages whose window ended before `at` never change and are cached forever.
+    :param link: page URL
+    :param at: date of the fetch, today by default
+    """
+    end = window_end(link)
+    return end is not None and end < (at or date.today())
+
+
+class PageCache:
+    def __init__(
+        self, path: str, ttl: float = DEFAULT_TTL, max_size: int = DEFAULT_MAX_SIZE
+    ):
+        """
+        On-disk cache of fetched pages addressed by their canonical URL.
+        Closed-window pages (see `is_closed_window`) never become stale.
+        :param path: directory to store pages in
+        :param ttl: seconds after which an open-window page is stale, never if None
+        :param max_size: total size of stored pages, least recently used are evicted
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._lock = threading.RLock()
+        self._index: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._size = 0
+        os.makedirs(path, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def key(link: str) -> str:
+        return hashlib.sha1(link.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        prefix = join(self.path, key[:2])
+        return join(prefix, f"{key}.html.gz"), join(prefix, f"{key}.json")
+
+    def _load_index(self):
+        entries = []
+        for prefix in os.listdir(self.path):
+            prefix_dir = join(self.path, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for fn in os.listdir(prefix_dir):
+                if not fn.endswith(".json"):
+                    continue
+                key = fn[: -len(".json")]
+                page_path, meta_path = self._paths(key)
+                if not os.path.isfile(page_path):
+                    continue
+                with open(meta_path, "r", encoding="utf-8") as fhandle:
+                    meta = json.load(fhandle)
+                meta.setdefault(
+                    "closed",
+                    is_closed_window(
+                        meta["url"], at=date.fromtimestamp(meta["fetched_at"])
+                    ),
+                )
+                # page file mtime is bumped on every hit and serves as access time
+                entries.append((os.path.getmtime(page_path), key, meta))
+
+        for _, key, meta in sorted(entries, key=lambda e: e[0]):
+            self._index[key] = meta
+            self._size += meta["compressed_size"]
+
+    def meta(self, link: str) -> Optional[Dict[str, Any]]:
+        """:returns: metadata (url, fetch time, size, status) of a stored page"""
+        with self._lock:
+            meta = self._index.get(self.key(link))
+            return None if meta is None else dict(meta)
+
+    def is_fresh(self, link: str, ttl: float = None) -> bool:
+        meta = self.meta(link)
+        if meta is None:
+            return False
+        if meta["closed"]:
+            return True
+        ttl = self.ttl if ttl is None else ttl
+        return ttl is None or time.time() - meta["fetched_at"] <= ttl
+
+    def get(self, link: str, ttl: float = None) -> Optional[str]:
+        """
+        Method returns stored page.
+        :param link: page URL
+        :param ttl: overrides cache TTL for this lookup
+        :returns: page source or None if missing or stale
+        """
+        if not self.is_fresh(link, ttl=ttl):
+            return None
+
+        key = self.key(link)
+        page_path, _ = self._paths(key)
+        try:
+            with gzip.open(page_path, "rt", encoding="utf-8") as fhandle:
+                page = fhandle.read()
+            os.utime(page_path)
+        except OSError:
+            self.discard(link)
+            return None
+
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+        return page
+
+    def put(self, link: str, page: str, status: int = 200):
+        """
+        Method stores page and evicts least recently used ones if needed.
+        :param link: page URL
+        :param page: page source
+        :param status: response status
+        """
+        key = self.key(link)
+        page_path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(page_path), exist_ok=True)
+
+        data = gzip.compress(page.encode("utf-8"))
+        tmp_path = f"{page_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as fhandle:
+            fhandle.write(data)
+        os.replace(tmp_path, page_path)
+
+        fetched_at = time.time()
+        meta = {
+            "url": link,
+            "fetched_at": fetched_at,
+            "closed": is_closed_window(link, at=date.fromtimestamp(fetched_at)),
+            "size": len(page),
+            "compressed_size": len(data),
+            "status": status,
+        }
+        with open(meta_path, "w", encoding="utf-8") as fhandle:
+            json.dump(meta, fhandle)
+
+        with self._lock:
+            previous = self._index.pop(key, None)
+            if previous is not None:
+                self._size -= previous["compressed_size"]
+            self._index[key] = meta
+            self._size += meta["compressed_size"]
+            self._evict()
+
+    def close_window(self, link: str, end: date):
+        """
+        Marks a stored page closed if it was fetched after its window ended,
+        for pages whose window is not in the URL, e.g. pages of a finished event.
+        :param link: page URL
+        :param end: last day covered by the page
+        """
+        key = self.key(link)
+        with self._lock:
+            meta = self._index.get(key)
+            if meta is None or meta["closed"]:
+                return
+            if not end < date.fromtimestamp(meta["fetched_at"]):
+                return
+
+            meta["closed"] = True
+            _, meta_path = self._paths(key)
+            with open(meta_path, "w", encoding="utf-8") as fhandle:
+                json.dump(meta, fhandle)
+
+    def discard(self, link: str):
+        with self._lock:
+            self._remove(self.key(link))
+
+    def _remove(self, key: str):
+        meta = self._index.pop(key, None)
+        if meta is not None:
+            self._size -= meta["compressed_size"]
+        for path in self._paths(key):
+            if os.path.isfile(path):
+                os.remove(path)
+
+    def _evict(self):
+        while self._size > self.max_size and len(self._index) > 1:
+            key = next(iter(self._index))
+            self._remove(key)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __contains__(self, link: str) -> bool:
+        return self.is_fresh(link)
+
+    def __len__(self) -> int:
+        return len(self._index)
@@ -0,0 +1,110 @@
+import threading
+from typing import Any, Dict, Optional
+
+from parsing.common import FetchError
+from parsing.fetch._backend import fetch
+from parsing.fetch._scheduler import CrawlScheduler
+
+
+class CrawlPlan:
+    def __init__(self, requeue: int = 2):
+        """
+        Collects page requests of a crawl, fetches every unique URL exactly once
+        and hands pages out to their consumers.
+        :param requeue: rounds of re-fetching pages that failed after all retries
+        """
+        self.requeue = requeue
+        self.requested = 0
+        self.fetched = 0
+        self.failed: Dict[str, str] = dict()
+
+        self._types: Dict[str, Any] = dict()
+        self._consumers: Dict[str, int] = dict()
+        self._pages: Dict[str, str] = dict()
+        self._lock = threading.Lock()
+
+    def add(self, link: str, page_type: Optional[Any] = None):
+        """
+        Registers one more consumer of the page.
+        :param link: canonical page URL
+        :param page_type: type of the page, selects fetch backend
+        """
+        with self._lock:
+            self.requested += 1
+            self._types.setdefault(link, page_type)
+            self._consumers[link] = self._consumers.get(link, 0) + 1
+
+    def execute(self, scheduler: CrawlScheduler):
+        """
+        Fetches all registered pages that are not loaded yet. Failed pages
+        are re-queued after the rest, giving the host time to recover.
+        """
+        for _ in range(1 + self.requeue):
+            with self._lock:
+                links = [
+                    link
+                    for link, consumers in self._consumers.items()
+                    if consumers > 0 and link not in self._pages
+                ]
+                self.failed.clear()
+
+            if len(links) == 0:
+                break
+            for link in links:
+                scheduler.submit(self._load, link)
+            scheduler.join()
+
+        if self.failed:
+            print(f"Crawl plan: {len(self.failed)} pages failed to load.")
+
+    def _load(self, link: str):
+        try:
+            page = fetch(link, self._types[link])
+        except FetchError as ex:
+            with self._lock:
+                self.failed[link] = str(ex)
+            return
+
+        with self._lock:
+            self._pages[link] = page
+            self.fetched += 1
+
+    def take(self, link: str, page_type: Optional[Any] = None) -> str:
+        """
+        Returns planned page, releasing it once the last consumer took it.
+        Pages missing from the plan are fetched on demand, pages that failed
+        to load during `execute` are not fetched again.
+        :param link: canonical page URL
+        :param page_type: type of the page
+        :returns: page source
+        :raises FetchError: if the page failed to load
+        """
+        with self._lock:
+            if link in self.failed:  # released, so later rounds do not reload it
+                self._consumers[link] -= 1
+                raise FetchError(self.failed[link])
+
+            page = self._pages.get(link)
+            if page is not None:
+                self._consumers[link] -= 1
+                if self._consumers[link] <= 0:
+                    del self._pages[link]
+                return page
+
+        with self._lock:
+            self.requested += 1
+            self.fetched += 1
+        return fetch(link, page_type)
+
+    def report(self) -> Dict[str, int]:
+        """:returns: number of requested pages, actual page loads, saved and failed ones"""
+        with self._lock:
+            return {
+                "requested": self.requested,
+                "fetched": self.fetched,
+                "saved": self.requested - self.fetched - len(self.failed),
+                "failed": len(self.failed),
+            }
+
+    def __len__(self) -> int:
+        return len(self._types)
@@ -0,0 +1,176 @@
+import atexit
+import threading
+from contextlib import contextmanager
+from typing import Callable, List
+
+from parsing.common import FantasyError
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+DEFAULT_POOL_SIZE = 1
+DEFAULT_MAX_PAGES = 100
+
+
+def _default_factory() -> webdriver.Chrome:
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    return webdriver.Chrome(options=options)
+
+
+class _Session:
+    """Driver handed out by the pool together with its usage counter."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class DriverPool:
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        factory: Callable[[], webdriver.Chrome] = _default_factory,
+    ):
+        """
+        Pool of reusable WebDriver sessions.
+        :param size: maximum number of simultaneously running browsers
+        :param max_pages: browser is recycled after loading this many pages
+        :param factory: callable that starts a new browser
+        """
+        if size < 1 or max_pages < 1:
+            raise FantasyError.invalid_arguments(f"size={size}, max_pages={max_pages}")
+
+        self.size = size
+        self.max_pages = max_pages
+        self.factory = factory
+
+        self._idle: List[_Session] = []
+        self._busy = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self) -> _Session:
+        """Blocks until a healthy session is available and returns it."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise FantasyError.something_went_wrong("driver pool is closed")
+                if self._idle:
+                    session = self._idle.pop()
+                    break
+                if self._busy < self.size:
+                    session = None
+                    break
+                self._cond.wait()
+            self._busy += 1
+
+        try:
+            if session is not None and not self._is_alive(session):
+                self._quit(session)
+                session = None
+            if session is None:
+                session = _Session(self.factory())
+        except BaseException:
+            with self._cond:
+                self._busy -= 1
+                self._cond.notify()
+            raise
+
+        return session
+
+    def release(self, session: _Session, broken: bool = False):
+        """
+        Returns session to the pool.
+        :param session: session taken with `acquire`
+        :param broken: forces the browser to be closed instead of reused
+        """
+        session.pages += 1
+        recycle = broken or self._closed or session.pages >= self.max_pages
+        if recycle:
+            self._quit(session)
+
+        with self._cond:
+            self._busy -= 1
+            if not recycle:
+                self._idle.append(session)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self):
+        """Context manager yielding a WebDriver for a single page load."""
+        session = self.acquire()
+        broken = False
+        try:
+            yield session.driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(session, broken=broken)
+
+    def close(self):
+        """Quits all idle browsers; busy ones are quit on release."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+
+        for session in idle:
+            self._quit(session)
+
+    @staticmethod
+    def _is_alive(session: _Session) -> bool:
+        try:
+            session.driver.current_url
+        except WebDriverException:
+            return False
+        return True
+
+    @staticmethod
+    def _quit(session: _Session):
+        try:
+            session.driver.quit()
+        except WebDriverException:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_pool: DriverPool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> DriverPool:
+    """:returns: shared pool used by all `get_page` implementations"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = DriverPool()
+        return _pool
+
+
+def configure_driver_pool(**kwargs) -> DriverPool:
+    """
+    Replaces shared pool with a new one, closing the previous.
+    :param kwargs: arguments of `DriverPool`
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = DriverPool(**kwargs)
+        return _pool
+
+
+@atexit.register
+def _close_driver_pool():
+    """Closes the shared pool, whichever it is at exit."""
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
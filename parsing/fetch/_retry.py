@@ -0,0 +1,122 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+from parsing.common import TokenBucket
+
+CHALLENGE_MARKERS = (
+    "Just a moment...",
+    "cf-browser-verification",
+    "cf-chl-",
+    "Attention Required! | Cloudflare",
+)
+
+
+def validate_page(page: str, page_type: Optional[Any] = None) -> Optional[str]:
+    """
+    Checks loaded page before it is cached or extracted.
+    :param page: page source
+    :param page_type: type of the page, declares expected `markers`
+    :returns: reason the page is invalid or None if it is fine
+    """
+    if not page or not page.strip():
+        return "empty page"
+
+    for marker in CHALLENGE_MARKERS:
+        if marker in page:
+            return f"challenge page ({marker})"
+
+    for marker in getattr(page_type, "markers", ()):
+        if marker not in page:
+            return f"missing '{marker}'"
+
+    return None
+
+
+class RetryPolicy:
+    def __init__(self, attempts: int = 4, base_delay: float = 2, max_delay: float = 60):
+        """
+        Exponential backoff with full jitter.
+        :param attempts: number of page loads before giving up
+        :param base_delay: delay after the first failure, seconds
+        :param max_delay: upper bound of a single delay, seconds
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """:returns: seconds to wait after failed attempt number `attempt` (from 0)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        limiter: TokenBucket = None,
+        window: int = 20,
+        threshold: float = 0.5,
+        cooldown: float = 60,
+        min_rate: float = 0.05,
+    ):
+        """
+        Slows the whole crawl down when recent error rate spikes.
+        While open, every fetch waits for the cooldown to pass; each trip also
+        halves the host rate, which recovers gradually after successes.
+        :param limiter: host rate limiter to adapt
+        :param window: number of recent page loads to compute error rate on
+        :param threshold: error rate that opens the breaker
+        :param cooldown: seconds the breaker stays open
+        :param min_rate: lowest rate the limiter is slowed down to
+        """
+        self.limiter = limiter
+        self.window = window
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.min_rate = min_rate
+
+        self.base_rate = limiter.rate if limiter is not None else None
+        self.trips = 0
+        self._outcomes = deque(maxlen=window)
+        self._opened_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Blocks while the breaker is open."""
+        with self._lock:
+            delay = self._opened_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, success: bool):
+        with self._lock:
+            self._outcomes.append(success)
+            if success:
+                self._recover()
+                return
+
+            errors = self._outcomes.count(False)
+            if (
+                len(self._outcomes) >= self.window // 2
+                and errors / len(self._outcomes) >= self.threshold
+                and time.monotonic() >= self._opened_until
+            ):
+                self._trip()
+
+    def _trip(self):
+        self.trips += 1
+        self._opened_until = time.monotonic() + self.cooldown
+        self._outcomes.clear()
+        if self.limiter is not None:
+            self.limiter.set_rate(max(self.min_rate, self.limiter.rate / 2))
+        print(f"Circuit breaker opened for {self.cooldown}s (trip {self.trips}).")
+
+    def _recover(self):
+        if self.limiter is not None and self.limiter.rate < self.base_rate:
+            self.limiter.set_rate(min(self.base_rate, self.limiter.rate * 1.1))
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self._opened_until
@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List
+
+
+class CrawlScheduler:
+    def __init__(self, workers: int = 4):
+        """
+        Runs crawl jobs on a pool of threads; jobs may submit further jobs.
+        Page loads are throttled by the host rate limiter inside `fetch`.
+        :param workers: number of concurrent fetch workers
+        """
+        self.workers = workers
+        self.errors: List[BaseException] = []
+
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending = 0
+        self._cond = threading.Condition()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        with self._cond:
+            self._pending += 1
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future):
+        with self._cond:
+            if not future.cancelled() and future.exception() is not None:
+                self.errors.append(future.exception())
+            self._pending -= 1
+            self._cond.notify_all()
+
+    def join(self):
+        """Waits for all submitted (and nested) jobs, re-raising the first failure."""
+        with self._cond:
+            while self._pending > 0:
+                self._cond.wait()
+            errors, self.errors = self.errors, []
+
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -2,44 +2,105 @@ import gc
 import json
 import os
 from os.path import join
-from typing import List
+from typing import Any, Dict, List, NamedTuple, Tuple
 
 import pandas as pd
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
+from parsing.archive import register_archive, unregister_archive
 from parsing.common import (
     Config,
     EventFilter,
     RankingFilter,
-    _read_path,
     get_features_name,
     get_page_name,
     get_ranking_page,
-    FantasyError
+    make_soup,
+    FantasyError,
+    FetchError,
 )
 from parsing.event import Event
-from parsing.player import PlayerStat
-from parsing.team import TeamProfile, TeamStat
+from parsing.fetch import (
+    CrawlPlan,
+    CrawlScheduler,
+    PageCache,
+    fetch,
+    get_cache,
+    is_closed_window,
+    set_cache,
+)
+from parsing.player import Player, PlayerStat
+from parsing.ranking import (
+    RankingIndex,
+    RankingStore,
+    get_ranking_index,
+    get_ranking_store,
+)
+from parsing.store import Entity, EntityStore, FeatureKey, FeatureStore
+from parsing.team import Team, TeamProfile, TeamStat
+from parsing.team._features import FEATURES, get_batch_features
+from parsing.team._preprocessing import _preprocess_matches, _preprocess_ranking
 
 RANKING_PATH = join("..", "data", "rankings")
-
-
-def parse_event_pages(event: Event, cfgs: List[Config], path: str, save="html"):
+CACHE_PATH = join("..", "data", "cache")
+FEATURES_VERSION = "v1"
+
+
+def parse_event_pages(
+    event: Event,
+    cfgs: List[Config],
+    path: str,
+    save="html",
+    cache: PageCache = None,
+    workers: int = 1,
+    archive: bool = False,
+    local_windows: bool = False,
+    store: FeatureStore = None,
+    entities: EntityStore = None,
+    version: str = FEATURES_VERSION,
+):
     """
     Parses all the data about event including teams and players.
     :param event: event object
     :param cfgs: list of filters to apply when parsing
     :param path: path to directory where event data is saved
     :param save: either "html" or "features".
+    :param cache: page cache, the one at CACHE_PATH is used if none is configured
+    :param workers: number of concurrent fetch workers
+    :param archive: with save="html", writes pages into a single event archive
+    :param local_windows: with save="features", loads full history of a team once
+        and calculates team features of every window and ranking filter locally
+    :param store: with save="features", reuses features of other events saved
+        in the store and saves the calculated ones into it
+    :param entities: with save="features", saves the event, its lineups and
+        maps of target pages into the entity store
+    :param version: with save="features", version of team features, see `FEATURES`
     :return:
     """
     assert save in ("html", "features")
-    if save == "html":
-        return _parse_html(event, cfgs, path)
-    elif save == "features":
-        return _parse_features(event, cfgs, path)
+    FEATURES.features(version)  # unknown versions fail before crawling
+    if cache is not None:
+        set_cache(cache)
+    elif get_cache() is None:
+        set_cache(PageCache(CACHE_PATH))
+
+    with CrawlScheduler(workers=workers) as scheduler:
+        if save == "html":
+            if not archive:
+                return _parse_html(event, cfgs, path, scheduler)
+
+            event_dir = os.path.join(path, str(event.key))
+            register_archive(event_dir)
+            try:
+                return _parse_html(event, cfgs, path, scheduler)
+            finally:
+                unregister_archive(event_dir)
+        elif save == "features":
+            return _parse_features(
+                event, cfgs, path, scheduler, local_windows, store, entities, version
+            )
 
 
-def _parse_html(event: Event, cfgs: List[Config], path: str):
+def _parse_html(event: Event, cfgs: List[Config], path: str, scheduler: CrawlScheduler):
     event_dir = os.path.join(path, str(event.key))
     os.makedirs(os.path.dirname(event_dir), exist_ok=True)
     event.get_page(os.path.join(event_dir, "overview.html"))
@@ -54,25 +115,30 @@ def _parse_html(event: Event, cfgs: List[Config], path: str):
         TeamStat.OVERVIEW,
         TeamStat.MATCHES,
         TeamStat.EVENT_HISTORY,
-        # TeamStat.LINEUPS,   # -- already in init_lineups()
+        TeamStat.LINEUPS,  # of the config, init_lineups() loads the current one
         # TeamProfile.PROFILE,  # -- deprecated, use Ranking.TEAMS instead
     ]
 
     player_pages = [PlayerStat.OVERVIEW, PlayerStat.CLUTCHES, PlayerStat.INDIVIDUAL]
 
-    for team in event.teams:
+    def init_team(team: Team):
         team_dir = os.path.join(teams_dir, str(team.key))
         fpath = os.path.join(team_dir, "lineup.html")
         team.get_page(TeamStat.LINEUPS, event=event.key, data_path=fpath)
         team.init_lineups(fpath)
 
+    for team in event.teams:
+        scheduler.submit(init_team, team)
+    scheduler.join()
+
     for cfg in cfgs:
         for team in event.teams:
             team_dir = os.path.join(teams_dir, str(team.key))
             os.makedirs(os.path.dirname(team_dir), exist_ok=True)
             for page_type in team_pages:
                 fpath = os.path.join(team_dir, get_page_name(str(page_type), cfg))
-                team.get_page(
+                scheduler.submit(
+                    team.get_page,
                     page_type,
                     event=event.key,
                     start=cfg.start_time,
@@ -87,7 +153,8 @@ def _parse_html(event: Event, cfgs: List[Config], path: str):
                 os.makedirs(os.path.dirname(player_dir), exist_ok=True)
                 for page_type in player_pages:
                     fpath = os.path.join(player_dir, get_page_name(str(page_type), cfg))
-                    player.get_page(
+                    scheduler.submit(
+                        player.get_page,
                         page_type,
                         start_time=cfg.start_time,
                         end_time=cfg.end_time,
@@ -110,7 +177,8 @@ def _parse_html(event: Event, cfgs: List[Config], path: str):
         team_dir = os.path.join(teams_dir, str(team.key))
         os.makedirs(os.path.dirname(team_dir), exist_ok=True)
         fpath = os.path.join(team_dir, get_page_name(str(TeamStat.MATCHES), cfg))
-        team.get_page(
+        scheduler.submit(
+            team.get_page,
             TeamStat.MATCHES,
             event=event.key,
             start=cfg.start_time,
@@ -125,7 +193,8 @@ def _parse_html(event: Event, cfgs: List[Config], path: str):
             fpath = os.path.join(
                 player_dir, get_page_name(str(PlayerStat.MATCHES), cfg)
             )
-            player.get_page(
+            scheduler.submit(
+                player.get_page,
                 PlayerStat.MATCHES,
                 event_key=event.key,
                 start_time=event.starts_at,
@@ -133,206 +202,355 @@ def _parse_html(event: Event, cfgs: List[Config], path: str):
                 path=fpath,
             )
 
+    scheduler.join()
 
-def _parse_features(event: Event, cfgs: List[Config], path: str):
-    event_dir = os.path.join(path, str(event.key))
-    os.makedirs(os.path.dirname(event_dir), exist_ok=True)
-    os.makedirs(event_dir, exist_ok=True)
 
-    if not os.path.exists(join(event_dir, "event.json")):
-        with open(join(event_dir, "event.json"), "w+") as fhandle:
-            json.dump(event.features_to_dict(), fhandle, indent=4, default=str)
+TEAM_FEATURE_PAGES = {
+    "overview": TeamStat.OVERVIEW,
+    "matches": TeamStat.MATCHES,
+    "events": TeamStat.EVENT_HISTORY,
+    "lineups": TeamStat.LINEUPS,
+}
 
-    teams_dir = os.path.join(event_dir, "teams")
-    players_dir = os.path.join(event_dir, "players")
-    os.makedirs(os.path.dirname(teams_dir), exist_ok=True)
-    os.makedirs(os.path.dirname(players_dir), exist_ok=True)
+PLAYER_FEATURE_PAGES = {
+    "overview": PlayerStat.OVERVIEW,
+    "clutches": PlayerStat.CLUTCHES,
+    "individual": PlayerStat.INDIVIDUAL,
+}
 
-    team_pages = {
-        "overview": TeamStat.OVERVIEW,
-        "matches": TeamStat.MATCHES,
-        "events": TeamStat.EVENT_HISTORY,
-        "lineups": TeamStat.LINEUPS,
-    }
+# full history pages of a team used with `local_windows`, lineups are added too
+TEAM_HISTORY_PAGES = {
+    "matches": TeamStat.MATCHES,
+    "events": TeamStat.EVENT_HISTORY,
+}
 
-    player_pages = {
-        "overview": PlayerStat.OVERVIEW,
-        "clutches": PlayerStat.CLUTCHES,
-        "individual": PlayerStat.INDIVIDUAL,
-    }
+TARGET_NAME = "target.json"
 
-    for team in event.teams:
-        lineups_page = team.get_page(
-            page_type=TeamStat.LINEUPS,
-            start=None,
-            end=event.starts_at.date(),
-            match=EventFilter.ALL,
-            rank=RankingFilter.ALL,
-            return_page=True,
-        )
-        lineups = BeautifulSoup(lineups_page, "html.parser")
-        team.init_lineups(path=None, src=lineups)
-
-        if len(team.players) == 0:
-            print(f"Team {team} has no players in lineups:")
-            print(team.extract_lineups(path=None, src=lineups))
-            continue
 
-    for cfg in cfgs:
-        features_name = get_features_name(cfg)
-        ranking = get_ranking_page(cfg, rankings_path=RANKING_PATH)
-        ranking_src = _read_path(join(RANKING_PATH, ranking))
-        print(f"Config {features_name}.")
+class _PageRequest(NamedTuple):
+    link: str
+    page_type: Any
+    outputs: Tuple[str, ...]  # page is needed only while none of them exists
 
-        # TEAMS
-        for team in event.teams:
-            if len(team.players) == 0:
-                continue
 
-            team_dir = os.path.join(teams_dir, str(team.key))
+def _lineups_link(team: Team, event: Event) -> str:
+    return team.get_page_link(
+        TeamStat.LINEUPS,
+        start=None,
+        end=event.starts_at.date(),
+        match=EventFilter.ALL,
+        rank=RankingFilter.ALL,
+    )
 
-            if os.path.exists(join(team_dir, features_name)):
-                continue
 
-            os.makedirs(team_dir, exist_ok=True)
-            # get needed HTML tags
-            pages = dict()
-            for page_name, page_type in team_pages.items():
-                page = team.get_page(
-                    page_type=page_type,
-                    start=cfg.start_time,
-                    end=cfg.end_time,
-                    match=cfg.event_fil,
-                    rank=cfg.ranking_fil,
-                    return_page=True,
-                )
-                pages[page_name] = BeautifulSoup(page, "html.parser")
+def _team_link(team: Team, page_type: TeamStat, cfg: Config) -> str:
+    return team.get_page_link(
+        page_type,
+        start=cfg.start_time,
+        end=cfg.end_time,
+        match=cfg.event_fil,
+        rank=cfg.ranking_fil,
+    )
 
-            # collect stats and calc features
-            stats = dict()
-            stats.update(
-                team.extract_ranking(
-                    path=None, src=ranking_src, team_name=team.name
-                )
-            )
-            stats.update(team.extract_overview(path=None, src=pages["overview"]))
-            stats.update(
-                team.extract_events(
-                    path=None, src=pages["events"], match=cfg.event_fil
-                )
-            )
-            stats.update(team.extract_lineups(path=None, src=pages["lineups"]))
-            stats.update(team.extract_matches(path=None, src=pages["matches"]))
 
-            prep_stats = team.preprocess_stats(stats)
-            features = team.get_features(prep_stats)
+def _history_filters(
+    cfg: Config, ranking_store: RankingStore
+) -> Tuple[EventFilter, RankingFilter]:
+    """
+    Filters full history pages of a config are loaded with. Ranking filter is
+    applied locally by opponent ranking at match date when the stored rankings
+    cover the window. Event tiers are not part of the match log, so pages of
+    event filters are still loaded, as well as all player pages.
+    """
+    if cfg.ranking_fil.top is not None and ranking_store.covers(
+        cfg.start_time, cfg.end_time
+    ):
+        return cfg.event_fil, RankingFilter.ALL
+    return cfg.event_fil, cfg.ranking_fil
+
+
+def _history_groups(
+    cfgs: List[Config], ranking_store: RankingStore
+) -> Dict[Tuple[EventFilter, RankingFilter], List[Config]]:
+    """Configs sharing page filters are windows over the same full history pages."""
+    groups = dict()
+    for cfg in cfgs:
+        groups.setdefault(_history_filters(cfg, ranking_store), []).append(cfg)
+    return groups
+
+
+def _team_history_link(
+    team: Team,
+    page_type: TeamStat,
+    filters: Tuple[EventFilter, RankingFilter],
+    cfgs: List[Config],
+) -> str:
+    return team.get_page_link(
+        page_type,
+        start=None,
+        end=max(cfg.end_time for cfg in cfgs),
+        match=filters[0],
+        rank=filters[1],
+    )
 
-            # save features
-            with open(
-                join(team_dir, features_name), "w", encoding="utf-8"
-            ) as fhandle:
-                json.dump(features.to_dict(), fhandle, indent=4, default=str)
 
-            # PLAYERS
-            for player in team.players:
-                player_dir = os.path.join(players_dir, str(player.key))
-                os.makedirs(player_dir, exist_ok=True)
-                if os.path.exists(join(player_dir, features_name)):
-                    continue
+def _player_link(player: Player, page_type: PlayerStat, cfg: Config) -> str:
+    return player.get_stat_link(
+        stat=page_type,
+        start_time=cfg.start_time,
+        end_time=cfg.end_time,
+        event_fil=cfg.event_fil,
+        ranking_fil=cfg.ranking_fil,
+    )
 
-                pages = dict()
-                for page_name, page_type in player_pages.items():
-                    page = player.get_page(
-                        page_type,
-                        start_time=cfg.start_time,
-                        end_time=cfg.end_time,
-                        event_fil=cfg.event_fil,
-                        ranking_fil=cfg.ranking_fil,
-                        return_page=True,
-                    )
-                    pages[page_name] = BeautifulSoup(page, "html.parser")
 
-                # collect stats and calc features
-                features = dict()
-                features.update(
-                    player.extract_overview_stats(path=None, src=pages["overview"])
-                )
-                features.update(
-                    player.extract_clutches_stats(path=None, src=pages["clutches"])
-                )
-                features.update(
-                    player.extract_individual_stats(path=None, src=pages["individual"])
-                )
+def _team_target_link(team: Team, event: Event) -> str:
+    # need target for teams and players
+    return team.get_page_link(
+        TeamStat.MATCHES,
+        event=event.key,
+        start=event.starts_at,
+        end=event.ends_at,
+        match=EventFilter.ALL,
+        rank=RankingFilter.ALL,
+    )
 
-                # save features
-                with open(
-                    join(player_dir, features_name), "w+", encoding="utf-8"
-                ) as fhandle:
-                    json.dump(features, fhandle, indent=4, default=str)
 
-    # need target for teams and players
-    cfg = Config(
+def _player_target_link(player: Player, event: Event) -> str:
+    return player.get_stat_link(
+        stat=PlayerStat.MATCHES,
+        event_key=event.key,
         start_time=event.starts_at,
         end_time=event.ends_at,
-        event_fil=EventFilter.ALL,
-        ranking_fil=RankingFilter.ALL,
     )
-    target_name = "target.json"
 
-    # TEAMS
+
+def _init_teams(event: Event, plan: CrawlPlan, scheduler: CrawlScheduler):
+    """Fetches lineups first since they define players of the teams."""
+
+    def init_team(team: Team):
+        try:
+            lineups_page = plan.take(_lineups_link(team, event), TeamStat.LINEUPS)
+        except FetchError as ex:  # team is left without players and skipped
+            print(f"Skipping lineups of {team}: {ex}.")
+            return
+        lineups = make_soup(lineups_page, TeamStat.LINEUPS.strainer)
+        team.init_lineups(path=None, src=lineups)
+
+        if len(team.players) == 0:
+            print(f"Team {team} has no players in lineups:")
+            print(team.extract_lineups(path=None, src=lineups))
+
+    for team in event.teams:
+        plan.add(_lineups_link(team, event), TeamStat.LINEUPS)
+    plan.execute(scheduler)
+
+    for team in event.teams:
+        scheduler.submit(init_team, team)
+    scheduler.join()
+
+
+def _feature_requests(
+    event: Event, cfgs: List[Config], event_dir: str, local_windows: bool = False
+) -> List[_PageRequest]:
+    """:returns: pages needed to build features and targets of initialized teams"""
+    teams_dir = join(event_dir, "teams")
+    players_dir = join(event_dir, "players")
+
+    requests = []
     for team in event.teams:
         if len(team.players) == 0:
             continue
 
         team_dir = join(teams_dir, str(team.key))
-        skip_team = False
-        if os.path.exists(join(team_dir, target_name)):
-            skip_team = True
-
-        if not skip_team:
-            page = team.get_page(
-                TeamStat.MATCHES,
-                event=event.key,
-                start=cfg.start_time,
-                end=cfg.end_time,
-                match=cfg.event_fil,
-                rank=cfg.ranking_fil,
-                return_page=True,
-            )
-            src = BeautifulSoup(page, "html.parser")
-            matches = team.get_target(path=None, src=src)
+        if local_windows:
+            outputs = tuple(join(team_dir, get_features_name(cfg)) for cfg in cfgs)
+            link = _lineups_link(team, event)
+            requests.append(_PageRequest(link, TeamStat.LINEUPS, outputs))
+
+            ranking_store = get_ranking_store(RANKING_PATH)
+            for filters, group in _history_groups(cfgs, ranking_store).items():
+                outputs = tuple(join(team_dir, get_features_name(cfg)) for cfg in group)
+                for page_type in TEAM_HISTORY_PAGES.values():
+                    link = _team_history_link(team, page_type, filters, group)
+                    requests.append(_PageRequest(link, page_type, outputs))
+
+        for cfg in cfgs:
+            team_output = join(team_dir, get_features_name(cfg))
+            if not local_windows:
+                for page_type in TEAM_FEATURE_PAGES.values():
+                    link = _team_link(team, page_type, cfg)
+                    requests.append(_PageRequest(link, page_type, (team_output,)))
+
+            for player in team.players:
+                player_output = join(
+                    players_dir, str(player.key), get_features_name(cfg)
+                )
+                for page_type in PLAYER_FEATURE_PAGES.values():
+                    link = _player_link(player, page_type, cfg)
+                    outputs = (team_output, player_output)
+                    requests.append(_PageRequest(link, page_type, outputs))
 
-            # save target
-            with open(join(team_dir, target_name), "w+", encoding="utf-8") as fhandle:
-                json.dump(matches, fhandle, indent=4, default=str)
+        link = _team_target_link(team, event)
+        outputs = (join(team_dir, TARGET_NAME),)
+        requests.append(_PageRequest(link, TeamStat.MATCHES, outputs))
 
         for player in team.players:
-            player_dir = os.path.join(players_dir, str(player.key))
-            if os.path.exists(join(player_dir, target_name)):
-                continue
+            link = _player_target_link(player, event)
+            outputs = (join(players_dir, str(player.key), TARGET_NAME),)
+            requests.append(_PageRequest(link, PlayerStat.MATCHES, outputs))
 
-            page = player.get_page(
-                PlayerStat.MATCHES,
-                event_key=event.key,
-                start_time=event.starts_at,
-                end_time=event.ends_at,
-                return_page=True,
+    return requests
+
+
+def _team_stats(
+    team: Team, pages: Dict[str, Tag], cfg: Config, ranking_index: RankingIndex
+) -> Dict[str, Any]:
+    """Collects and preprocesses stats of a team from parsed TEAM_FEATURE_PAGES."""
+    stats = dict()
+    stats.update(
+        team.extract_ranking(path=None, team_name=team.name, index=ranking_index)
+    )
+    stats.update(team.extract_overview(path=None, src=pages["overview"]))
+    stats.update(
+        team.extract_events(path=None, src=pages["events"], match=cfg.event_fil)
+    )
+    stats.update(team.extract_lineups(path=None, src=pages["lineups"]))
+    stats.update(team.extract_matches(path=None, src=pages["matches"]))
+
+    return team.preprocess_stats(stats)
+
+
+def _write_team_features(
+    team_stats: Dict[str, Dict[str, Any]], version: str = FEATURES_VERSION
+):
+    """
+    Calculates features of all teams and configs in one batch and saves them
+    to separate files in the format of `Team.get_features(...).to_dict()`.
+    :param team_stats: pairs (features path, preprocessed stats)
+    :param version: features version, see `FEATURES`
+    """
+    paths = list(team_stats)
+    features = get_batch_features([team_stats[path] for path in paths], version=version)
+    _write_features(paths, features)
+
+
+def _write_features(paths: List[str], features: pd.DataFrame):
+    """Saves row i of features to paths[i] as a one-row `DataFrame.to_dict()`."""
+    for path, record in zip(paths, features.to_dict(orient="records")):
+        with open(path, "w", encoding="utf-8") as fhandle:
+            data = {name: {0: value} for name, value in record.items()}
+            json.dump(data, fhandle, indent=4, default=str)
+
+
+def _feature_keys(
+    team: Team, cfg: Config, event_dir: str, version: str = FEATURES_VERSION
+) -> List[Tuple[FeatureKey, str]]:
+    """:returns: pairs (store key, features path) of a team and its players"""
+    team_dir = join(event_dir, "teams", str(team.key))
+    players_dir = join(event_dir, "players")
+    features_name = get_features_name(cfg)
+
+    keys = [
+        (
+            FeatureKey.from_config(Entity.TEAM, team.key, cfg, version),
+            join(team_dir, features_name),
+        )
+    ]
+    for player in team.players:
+        keys.append(
+            (
+                FeatureKey.from_config(Entity.PLAYER, player.key, cfg, version),
+                join(players_dir, str(player.key), features_name),
             )
-            src = BeautifulSoup(page, "html.parser")
-            matches = player.extract_matches_stats(path=None, src=src)
+        )
+    return keys
 
-            # save target
-            with open(join(player_dir, target_name), "w+", encoding="utf-8") as fhandle:
-                json.dump(
-                    player.calculate_target(matches), fhandle, indent=4, default=str
-                )
 
-    # META
+def _restore_features(
+    store: FeatureStore,
+    teams: List[Team],
+    cfgs: List[Config],
+    event_dir: str,
+    version: str = FEATURES_VERSION,
+) -> int:
+    """
+    Writes features saved in the store (e.g. by another event with the same
+    windows) to missing files, so they are neither crawled nor calculated.
+    Features of a config are restored only if the team and all its players
+    are in the store, since players are calculated together with the team.
+    :returns: number of restored team configs
+    """
+    restored = 0
+    for team in teams:
+        for cfg in cfgs:
+            keys = _feature_keys(team, cfg, event_dir, version)
+            if os.path.exists(keys[0][1]):
+                continue
+
+            saved = [store.get(key) for key, _ in keys]
+            if any(features is None for features in saved):
+                continue
+
+            (_, team_path), team_features = keys[0], saved[0]
+            os.makedirs(os.path.dirname(team_path), exist_ok=True)
+            with open(team_path, "w", encoding="utf-8") as fhandle:
+                data = {name: {0: value} for name, value in team_features.items()}
+                json.dump(data, fhandle, indent=4, default=str)
+
+            for (_, path), features in zip(keys[1:], saved[1:]):
+                if os.path.exists(path):
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w+", encoding="utf-8") as fhandle:
+                    json.dump(features, fhandle, indent=4, default=str)
+            restored += 1
+
+    return restored
+
+
+def _store_features(
+    store: FeatureStore,
+    teams: List[Team],
+    cfgs: List[Config],
+    event_dir: str,
+    version: str = FEATURES_VERSION,
+):
+    """Saves features files of teams and their players into the store."""
+    items = []
+    for team in teams:
+        for cfg in cfgs:
+            keys = _feature_keys(team, cfg, event_dir, version)
+            for index, (key, path) in enumerate(keys):
+                if not os.path.exists(path):
+                    continue
+                with open(path, "r", encoding="utf-8") as fhandle:
+                    features = json.load(fhandle)
+                if index == 0:  # team features are a one-row `DataFrame.to_dict()`
+                    features = {
+                        name: next(iter(column.values()))
+                        for name, column in features.items()
+                    }
+                items.append((key, features))
+
+    store.put_many(items)
+
+
+def _player_features(player: Player, pages: Dict[str, Tag]) -> Dict[str, Any]:
+    """Collects stats of a player from parsed PLAYER_FEATURE_PAGES."""
+    features = dict()
+    features.update(player.extract_overview_stats(path=None, src=pages["overview"]))
+    features.update(player.extract_clutches_stats(path=None, src=pages["clutches"]))
+    features.update(player.extract_individual_stats(path=None, src=pages["individual"]))
+    return features
+
+
+def _write_meta(event_dir: str, teams: List[Team]):
     team2player = {}
     player2team = {}
     team_id2name = {}
     player_id2name = {}
-    for team in event.teams:
+    for team in teams:
         team2player[team.key] = []
         team_id2name[team.key] = team.name
 
@@ -356,3 +574,304 @@ def _parse_features(event: Event, cfgs: List[Config], path: str):
 
     with open(join(event_dir, "player_id2name.json"), "w+") as fhandle:
         json.dump(player_id2name, fhandle, indent=4, default=str)
+
+
+def _parse_features(
+    event: Event,
+    cfgs: List[Config],
+    path: str,
+    scheduler: CrawlScheduler,
+    local_windows: bool = False,
+    store: FeatureStore = None,
+    entities: EntityStore = None,
+    version: str = FEATURES_VERSION,
+):
+    event_dir = os.path.join(path, str(event.key))
+    os.makedirs(os.path.dirname(event_dir), exist_ok=True)
+    os.makedirs(event_dir, exist_ok=True)
+
+    if not os.path.exists(join(event_dir, "event.json")):
+        with open(join(event_dir, "event.json"), "w+") as fhandle:
+            json.dump(event.features_to_dict(), fhandle, indent=4, default=str)
+
+    teams_dir = os.path.join(event_dir, "teams")
+    players_dir = os.path.join(event_dir, "players")
+    os.makedirs(os.path.dirname(teams_dir), exist_ok=True)
+    os.makedirs(os.path.dirname(players_dir), exist_ok=True)
+
+    def player_features(player: Player, cfg: Config, features_name: str):
+        player_dir = os.path.join(players_dir, str(player.key))
+        os.makedirs(player_dir, exist_ok=True)
+        if os.path.exists(join(player_dir, features_name)):
+            return
+
+        pages = dict()
+        try:
+            for page_name, page_type in PLAYER_FEATURE_PAGES.items():
+                page = plan.take(_player_link(player, page_type, cfg), page_type)
+                pages[page_name] = make_soup(page, page_type.strainer)
+        except FetchError as ex:
+            print(f"Skipping features of {player}: {ex}.")
+            return
+
+        features = _player_features(player, pages)
+
+        # save features
+        with open(join(player_dir, features_name), "w+", encoding="utf-8") as fhandle:
+            json.dump(features, fhandle, indent=4, default=str)
+
+    def team_features(team: Team, rankings: List[Tuple[Config, RankingIndex]]):
+        # configs of a team run in order since `preprocess_stats` updates its players
+        team_dir = os.path.join(teams_dir, str(team.key))
+
+        for cfg, ranking_index in rankings:
+            features_name = get_features_name(cfg)
+            if os.path.exists(join(team_dir, features_name)):
+                continue
+
+            os.makedirs(team_dir, exist_ok=True)
+            # get needed HTML tags
+            pages = dict()
+            try:
+                for page_name, page_type in TEAM_FEATURE_PAGES.items():
+                    page = plan.take(_team_link(team, page_type, cfg), page_type)
+                    pages[page_name] = make_soup(page, page_type.strainer)
+            except FetchError as ex:
+                print(f"Skipping features of {team} for {features_name}: {ex}.")
+                continue
+
+            stats = _team_stats(team, pages, cfg, ranking_index)
+            team_stats[join(team_dir, features_name)] = stats  # saved in a batch
+
+            # PLAYERS
+            for player in list(team.players):
+                scheduler.submit(player_features, player, cfg, features_name)
+
+    def team_history_features(team: Team, rankings: List[Tuple[Config, RankingIndex]]):
+        team_dir = os.path.join(teams_dir, str(team.key))
+        pending = [
+            (cfg, ranking_index)
+            for cfg, ranking_index in rankings
+            if not os.path.exists(join(team_dir, get_features_name(cfg)))
+        ]
+        if len(pending) == 0:
+            return
+
+        os.makedirs(team_dir, exist_ok=True)
+        try:
+            lineups_page = plan.take(_lineups_link(team, event), TeamStat.LINEUPS)
+        except FetchError as ex:
+            print(f"Skipping features of {team}: {ex}.")
+            return
+        lineups = make_soup(lineups_page, TeamStat.LINEUPS.strainer)
+
+        ranking_store = get_ranking_store(RANKING_PATH)
+        groups = _history_groups([cfg for cfg, _ in rankings], ranking_store)
+        for filters, history_cfgs in groups.items():
+            group = [(cfg, index) for cfg, index in pending if cfg in history_cfgs]
+            if len(group) == 0:
+                continue
+
+            pages = {"lineups": lineups}
+            try:
+                for page_name, page_type in TEAM_HISTORY_PAGES.items():
+                    link = _team_history_link(team, page_type, filters, history_cfgs)
+                    page = plan.take(link, page_type)
+                    pages[page_name] = make_soup(page, page_type.strainer)
+            except FetchError as ex:
+                print(f"Skipping history of {team} for {filters}: {ex}.")
+                continue
+            history = team.get_history(
+                pages, match=filters[0], ranking_store=ranking_store
+            )
+
+            # configs with ranking filters applied locally, by the filter
+            tops = dict()
+            for cfg, index in group:
+                top = cfg.ranking_fil.top if cfg.ranking_fil != filters[1] else None
+                tops.setdefault(top, []).append((cfg, index))
+
+            for top, top_group in tops.items():
+                ranks = [
+                    team.extract_ranking(path=None, team_name=team.name, index=index)
+                    for _, index in top_group
+                ]
+                top_history = history if top is None else history.against_top(top)
+                features = top_history.get_features(
+                    windows=[(cfg.start_time, cfg.end_time) for cfg, _ in top_group],
+                    rankings=[_preprocess_ranking(rank["ranking"]) for rank in ranks],
+                    version=version,
+                )
+                paths = [join(team_dir, get_features_name(cfg)) for cfg, _ in top_group]
+                _write_features(paths, features)
+
+            # PLAYERS
+            for cfg, _ in group:
+                for player in list(team.players):
+                    scheduler.submit(
+                        player_features, player, cfg, get_features_name(cfg)
+                    )
+
+    def team_target(team: Team):
+        team_dir = join(teams_dir, str(team.key))
+        if os.path.exists(join(team_dir, TARGET_NAME)):
+            return
+
+        try:
+            page = plan.take(_team_target_link(team, event), TeamStat.MATCHES)
+        except FetchError as ex:
+            print(f"Skipping target of {team}: {ex}.")
+            return
+
+        os.makedirs(team_dir, exist_ok=True)  # features of the team may be skipped
+        src = make_soup(page, TeamStat.MATCHES.strainer)
+        # same as `Team.get_target`, raw maps of the page also go to the store
+        maps = team.extract_matches(path=None, src=src)["matches"]
+        if entities is not None:
+            entities.add_team_maps(team.key, maps)
+        matches = _preprocess_matches(maps)
+
+        # save target
+        with open(join(team_dir, TARGET_NAME), "w+", encoding="utf-8") as fhandle:
+            json.dump(matches, fhandle, indent=4, default=str)
+
+    def player_target(player: Player):
+        player_dir = os.path.join(players_dir, str(player.key))
+        if os.path.exists(join(player_dir, TARGET_NAME)):
+            return
+
+        try:
+            page = plan.take(_player_target_link(player, event), PlayerStat.MATCHES)
+        except FetchError as ex:
+            print(f"Skipping target of {player}: {ex}.")
+            return
+
+        os.makedirs(player_dir, exist_ok=True)
+        src = make_soup(page, PlayerStat.MATCHES.strainer)
+        matches = player.extract_matches_stats(path=None, src=src)
+        if entities is not None:
+            entities.add_player_maps(player.key, event.key, matches)
+
+        # save target
+        with open(join(player_dir, TARGET_NAME), "w+", encoding="utf-8") as fhandle:
+            json.dump(player.calculate_target(matches), fhandle, indent=4, default=str)
+
+    plan = CrawlPlan()
+    _init_teams(event, plan, scheduler)
+
+    rankings = []
+    for cfg in cfgs:
+        ranking = get_ranking_page(cfg, rankings_path=RANKING_PATH)
+        rankings.append((cfg, get_ranking_index(join(RANKING_PATH, ranking))))
+        print(f"Config {get_features_name(cfg)}.")
+
+    teams = [team for team in event.teams if len(team.players) > 0]
+    if store is not None:
+        restored = _restore_features(store, teams, cfgs, event_dir, version)
+        print(f"Restored {restored} team configs from the feature store.")
+
+    for request in _feature_requests(event, cfgs, event_dir, local_windows):
+        if not any(os.path.exists(output) for output in request.outputs):
+            plan.add(request.link, request.page_type)
+
+    plan.execute(scheduler)
+    report = plan.report()
+    print(
+        f"Crawl plan: {report['requested']} pages requested, "
+        f"{report['fetched']} loaded, {report['saved']} saved."
+    )
+
+    # TEAMS
+    team_stats = dict()
+    jobs = []
+    for team in teams:
+        job = team_history_features if local_windows else team_features
+        jobs.append((team, scheduler.submit(job, team, rankings)))
+    error = None
+    try:
+        scheduler.join()
+    except Exception as ex:
+        # features of the teams that succeeded are still saved before re-raising
+        error = ex
+        failed = [team for team, job in jobs if job.exception() is not None]
+        print(f"Features of {len(failed)} teams failed: {failed}.")
+    _write_team_features(team_stats, version)
+    if store is not None:
+        _store_features(store, teams, cfgs, event_dir, version)
+    if error is not None:
+        raise error
+
+    # TARGETS
+    for team in teams:
+        scheduler.submit(team_target, team)
+        for player in team.players:
+            scheduler.submit(player_target, player)
+    scheduler.join()
+
+    # META
+    _write_meta(event_dir, event.teams)
+    if entities is not None:
+        entities.ingest_event_dir(event_dir, name=event.name)
+
+
+def refresh_event_pages(
+    event: Event,
+    cfgs: List[Config],
+    path: str,
+    cache: PageCache = None,
+    workers: int = 1,
+    local_windows: bool = False,
+) -> int:
+    """
+    Re-fetches only pages of an event whose cached copies may still change,
+    i.e. were not fetched after their window closed (closed copies never change),
+    and removes features and targets built from pages that have changed,
+    so the next `parse_event_pages(save="features")` rebuilds them from cache.
+    :param event: event object
+    :param cfgs: list of filters used when parsing
+    :param path: path to directory where event data is saved
+    :param cache: page cache, the one at CACHE_PATH is used if none is configured
+    :param workers: number of concurrent fetch workers
+    :param local_windows: whether features were parsed with `local_windows`
+    :return: number of reloaded pages
+    """
+    if cache is not None:
+        set_cache(cache)
+    elif get_cache() is None:
+        set_cache(PageCache(CACHE_PATH))
+    cache = get_cache()
+
+    event_dir = join(path, str(event.key))
+    refreshed = []
+
+    def refresh(link: str, page_type: Any, outputs: List[str]):
+        previous = cache.get(link, ttl=float("inf"))
+        page = fetch(link, page_type, refresh=True)
+        refreshed.append(link)
+        if page == previous:
+            return
+
+        for output in outputs:
+            if os.path.exists(output):
+                os.remove(output)
+
+    with CrawlScheduler(workers=workers) as scheduler:
+        _init_teams(event, CrawlPlan(), scheduler)
+
+        outputs = dict()
+        page_types = dict()
+        for request in _feature_requests(event, cfgs, event_dir, local_windows):
+            # a copy fetched while its window was open is refreshed once it closes
+            meta = cache.meta(request.link)
+            closed = is_closed_window(request.link) if meta is None else meta["closed"]
+            if closed:
+                continue
+            page_types[request.link] = request.page_type
+            outputs.setdefault(request.link, set()).update(request.outputs)
+
+        for link, page_type in page_types.items():
+            scheduler.submit(refresh, link, page_type, sorted(outputs[link]))
+        scheduler.join()
+
+    print(f"Refreshed {len(refreshed)} pages of {event}.")
+    return len(refreshed)
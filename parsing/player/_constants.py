@@ -10,3 +10,36 @@ class PlayerStat(Enum):
 
     def __str__(self):
         return self.value
+
+    @property
+    def markers(self):
+        """HTML fragments any valid page of this type contains."""
+        return _PLAYER_STAT_MARKERS[self]
+
+    @property
+    def strainer(self):
+        """Strainer parsing only fragments extractors need from this page."""
+        from parsing.common import page_strainer
+
+        return page_strainer(*_PLAYER_STAT_FRAGMENTS[self])
+
+
+_PLAYER_STAT_MARKERS = {
+    PlayerStat.OVERVIEW: ("summaryStatBreakdownDataValue",),
+    PlayerStat.INDIVIDUAL: ("stats-row",),
+    PlayerStat.MATCHES: ("stats-table",),
+    PlayerStat.EVENTS: ("stats-table",),
+    PlayerStat.CLUTCHES: ('class="summary"',),
+}
+
+# pairs (tag, class) of top-level fragments read by the extractors
+_PLAYER_STAT_FRAGMENTS = {
+    PlayerStat.OVERVIEW: (
+        ("div", "summaryStatBreakdownDataValue"),
+        ("div", "stats-rows"),
+    ),
+    PlayerStat.INDIVIDUAL: (("div", "stats-row"),),
+    PlayerStat.MATCHES: (("table", "stats-table"),),
+    PlayerStat.EVENTS: (("table", "stats-table"),),
+    PlayerStat.CLUTCHES: (("div", "summary"),),
+}
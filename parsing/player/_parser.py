@@ -1,11 +1,11 @@
-import os
 from datetime import date
 from datetime import timedelta as td
 from typing import Union
 
+from parsing.archive import page_exists, save_page
 from parsing.common import EventFilter, RankingFilter
+from parsing.fetch import fetch
 from parsing.player import PlayerStat
-from selenium import webdriver
 
 
 def get_page(
@@ -31,10 +31,9 @@ def get_page(
     :param return_page: returns page if True
     """
 
-    if path and os.path.isfile(path):
+    if path and page_exists(path):
         return
 
-    dr = webdriver.Chrome()
     link = self.get_stat_link(
         stat=page_type,
         event_key=event_key,
@@ -44,10 +43,9 @@ def get_page(
         ranking_fil=ranking_fil,
     )
 
-    dr.get(link)
+    page_source = fetch(link, page_type)
+
     if path:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(dr.page_source)
+        save_page(path, page_source)
     if return_page:
-        return dr.page_source
+        return page_source
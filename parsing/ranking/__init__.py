@@ -0,0 +1,9 @@
+from parsing.ranking._index import RankingIndex, get_ranking_index
+from parsing.ranking._store import RankingStore, get_ranking_store
+
+__all__ = [
+    "RankingIndex",
+    "get_ranking_index",
+    "RankingStore",
+    "get_ranking_store",
+]
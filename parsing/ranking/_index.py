@@ -0,0 +1,66 @@
+import os
+import threading
+from typing import Dict, Optional
+
+from bs4 import Tag
+from parsing.common import _get_src
+from parsing.team._extractor import _get_tag, _prep_team_name
+
+_EMPTY = {"points": None, "world_ranking": None, "ranking_change": None}
+
+
+class RankingIndex:
+    def __init__(self, entries: Dict[str, Dict[str, Optional[str]]]):
+        """
+        Ranking snapshot indexed by normalized team name.
+        :param entries: normalized name -> raw points, world_ranking, ranking_change
+        """
+        self.entries = entries
+
+    @classmethod
+    def from_src(cls, path: str = None, src: Tag = None) -> "RankingIndex":
+        """Parses ranking page once, keeping the first entry for each name."""
+        src = _get_src(path, src)
+
+        entries = dict()
+        for team in src.find_all("div", class_="ranked-team standard-box"):
+            name = _prep_team_name(_get_tag(team, "span", class_="name"))
+            entries.setdefault(
+                name,
+                {
+                    "points": _get_tag(team, "span", class_="points"),
+                    "world_ranking": _get_tag(team, "span", class_="position"),
+                    "ranking_change": _get_tag(team, "div", class_="change"),
+                },
+            )
+
+        return cls(entries)
+
+    def lookup(self, team_name: str) -> Dict[str, Optional[str]]:
+        """:returns: raw ranking stats in `extract_ranking` format"""
+        return dict(self.entries.get(_prep_team_name(team_name), _EMPTY))
+
+    def __contains__(self, team_name: str) -> bool:
+        return _prep_team_name(team_name) in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+_indices: Dict[str, RankingIndex] = dict()
+_indices_lock = threading.Lock()
+
+
+def get_ranking_index(path: str) -> RankingIndex:
+    """
+    Returns index of a ranking page, parsing it once per process.
+    :param path: path to the ranking page, e.g. 'data/rankings/2024-01-01.html'
+    """
+    key = os.path.abspath(path)
+    with _indices_lock:
+        index = _indices.get(key)
+    if index is None:
+        index = RankingIndex.from_src(path=path)
+        with _indices_lock:
+            index = _indices.setdefault(key, index)
+    return index
@@ -0,0 +1,210 @@
+import os
+import threading
+from bisect import bisect_right
+from datetime import date, datetime
+from datetime import timedelta as td
+from os.path import join
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from parsing.common import FantasyError
+from parsing.ranking._index import get_ranking_index
+from parsing.team._extractor import _prep_team_name
+from parsing.team._preprocessing import _preprocess_ranking
+
+MAX_RANKING_LAG = td(days=7)  # the closest older snapshot may be at most a week old
+STORE_NAME = "ranking_store.pkl"
+
+
+class RankingStore:
+    def __init__(self, path: str, persist: bool = True):
+        """
+        Time series of all ranking snapshots stored in `path` as '<date>.html'.
+        :param path: rankings directory
+        :param persist: keeps ingested table next to the snapshots
+        """
+        if not os.path.isdir(path):
+            raise FantasyError.invalid_arguments(f"not such path {path}")
+
+        self.path = path
+        self.persist = persist
+        self.dates: List[date] = []
+        self._table: Optional[pd.DataFrame] = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """Re-lists snapshots if the directory has changed."""
+        mtime = os.stat(self.path).st_mtime
+        if mtime == self._mtime:
+            return
+
+        dates = []
+        for fn in os.listdir(self.path):
+            stem, ext = os.path.splitext(fn)
+            if ext != ".html":
+                continue
+            try:
+                dates.append(datetime.strptime(stem, "%Y-%m-%d").date())
+            except ValueError:
+                continue
+
+        with self._lock:
+            self.dates = sorted(dates)
+            self._table = None
+            self._mtime = mtime
+
+    def snapshot_date(self, date_: Union[date, datetime]) -> date:
+        """:returns: date of the latest snapshot at most a week older than `date_`"""
+        if isinstance(date_, datetime):
+            date_ = date_.date()
+
+        pos = bisect_right(self.dates, date_) - 1
+        if pos < 0 or date_ - self.dates[pos] > MAX_RANKING_LAG:
+            raise FantasyError.no_data(
+                f"For given date {date_} no close ranking is found."
+            )
+        return self.dates[pos]
+
+    def covers(self, start: Union[date, datetime], end: Union[date, datetime]) -> bool:
+        """:returns: True if every day of [start, end] has a close snapshot"""
+        start = start.date() if isinstance(start, datetime) else start
+        end = end.date() if isinstance(end, datetime) else end
+        try:
+            snapshots = [self.snapshot_date(start)]
+        except ValueError:
+            return False
+
+        snapshots += self.dates[
+            bisect_right(self.dates, start) : bisect_right(self.dates, end)
+        ]
+        gaps = [b - a for a, b in zip(snapshots, snapshots[1:])]
+        return (
+            all(gap <= MAX_RANKING_LAG + td(days=1) for gap in gaps)
+            and end - snapshots[-1] <= MAX_RANKING_LAG
+        )
+
+    def snapshot_path(self, date_: Union[date, datetime]) -> str:
+        return join(self.path, f"{self.snapshot_date(date_)}.html")
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """Date-sorted table of (date, team, world_ranking, points, ranking_change)."""
+        with self._lock:
+            if self._table is None:
+                self._table = self._load()
+            return self._table
+
+    def _load(self) -> pd.DataFrame:
+        store_path = join(self.path, STORE_NAME)
+        if self.persist and os.path.isfile(store_path):
+            table = pd.read_pickle(store_path)
+            ingested = set(table["date"].dt.date.unique())
+            if ingested.issuperset(self.dates):
+                return table[table["date"].dt.date.isin(self.dates)]
+
+        table = self._ingest()
+        if self.persist:
+            table.to_pickle(store_path)
+        return table
+
+    def _ingest(self) -> pd.DataFrame:
+        columns = {
+            k: [] for k in ("date", "team", "world_ranking", "points", "ranking_change")
+        }
+        for date_ in self.dates:
+            index = get_ranking_index(join(self.path, f"{date_}.html"))
+            for team, raw in index.entries.items():
+                ranking = _preprocess_ranking(raw)
+                columns["date"].append(date_)
+                columns["team"].append(team)
+                for k in ("world_ranking", "points", "ranking_change"):
+                    columns[k].append(ranking[k])
+
+        table = pd.DataFrame(columns)
+        table["date"] = pd.to_datetime(table["date"]).astype("datetime64[ns]")
+        table["world_ranking"] = table["world_ranking"].astype(np.int16)
+        table["points"] = table["points"].astype(np.int32)
+        table["ranking_change"] = table["ranking_change"].astype(np.int16)
+        return table.sort_values(["date", "world_ranking"], ignore_index=True)
+
+    def lookup(
+        self, team_name: str, date_: Union[date, datetime]
+    ) -> Optional[Dict[str, int]]:
+        """:returns: team's ranking as of the date or None if it is not ranked"""
+        snapshot = np.datetime64(self.snapshot_date(date_), "ns")
+        table = self.table
+        lo = table["date"].values.searchsorted(snapshot, side="left")
+        hi = table["date"].values.searchsorted(snapshot, side="right")
+        rows = table.iloc[lo:hi]
+        rows = rows[rows["team"] == _prep_team_name(team_name)]
+        if len(rows) == 0:
+            return None
+        row = rows.iloc[0]
+        return {
+            "world_ranking": int(row["world_ranking"]),
+            "points": int(row["points"]),
+            "ranking_change": int(row["ranking_change"]),
+        }
+
+    def asof_join(
+        self, frame: pd.DataFrame, team_col: str = "team", date_col: str = "date"
+    ) -> pd.DataFrame:
+        """
+        Attaches ranking as of the date to every (team, date) pair at once.
+        :param frame: frame with team names and dates
+        :param team_col: column with team names
+        :param date_col: column with dates
+        :returns: copy of the frame with world_ranking, points and ranking_change
+        columns (NaN where the team is not ranked or no close snapshot exists)
+        """
+        left = pd.DataFrame(
+            {
+                "_row": np.arange(len(frame)),
+                "_team": frame[team_col].astype(str).map(_prep_team_name).values,
+                "_date": pd.to_datetime(frame[date_col]).values.astype(
+                    "datetime64[ns]"
+                ),
+            }
+        )
+        left = left.sort_values("_date", kind="stable")
+
+        # team's own row is missing from a snapshot if it dropped out of it,
+        # so the snapshot date is resolved first and the team is matched exactly
+        snapshots = pd.DataFrame(
+            {"_snapshot": pd.to_datetime(self.dates).astype("datetime64[ns]")}
+        )
+        snapshots["_date"] = snapshots["_snapshot"]
+        left = pd.merge_asof(
+            left,
+            snapshots,
+            on="_date",
+            direction="backward",
+            tolerance=pd.Timedelta(MAX_RANKING_LAG),
+        )
+
+        right = self.table.rename(columns={"date": "_snapshot", "team": "_team"})
+        joined = left.merge(right, on=["_snapshot", "_team"], how="left")
+        joined = joined.drop_duplicates("_row").sort_values("_row")
+
+        result = frame.copy()
+        for col in ("world_ranking", "points", "ranking_change"):
+            result[col] = joined[col].values
+        return result
+
+
+_stores: Dict[str, RankingStore] = dict()
+_stores_lock = threading.Lock()
+
+
+def get_ranking_store(path: str) -> RankingStore:
+    """:returns: store of the rankings directory, shared by the process"""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = RankingStore(path)
+        store = _stores[key]
+    store.refresh()
+    return store
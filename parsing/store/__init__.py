@@ -0,0 +1,18 @@
+from parsing.store._entities import EntityStore, get_entity_store
+from parsing.store._features import (
+    DEFAULT_VERSION,
+    Entity,
+    FeatureKey,
+    FeatureStore,
+    get_feature_store,
+)
+
+__all__ = [
+    "EntityStore",
+    "get_entity_store",
+    "DEFAULT_VERSION",
+    "Entity",
+    "FeatureKey",
+    "FeatureStore",
+    "get_feature_store",
+]
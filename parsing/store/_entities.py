@@ -0,0 +1,276 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from os.path import join
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+from parsing.common import FantasyError
+from parsing.store._features import _to_date
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    event_id INTEGER PRIMARY KEY,
+    name TEXT,
+    start_at TEXT,
+    ends_at TEXT,
+    is_lan INTEGER,
+    is_qual INTEGER,
+    prize_pool INTEGER
+);
+CREATE TABLE IF NOT EXISTS teams (team_id INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE IF NOT EXISTS players (player_id INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE IF NOT EXISTS lineups (
+    event_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    player_id INTEGER NOT NULL,
+    as_of TEXT,
+    PRIMARY KEY (event_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS lineups_by_player ON lineups (player_id, as_of);
+CREATE INDEX IF NOT EXISTS lineups_by_team ON lineups (team_id, as_of);
+CREATE TABLE IF NOT EXISTS team_maps (
+    team_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    event TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    map TEXT NOT NULL,
+    rounds_won INTEGER,
+    rounds_lost INTEGER,
+    result TEXT,
+    is_last_map INTEGER,
+    PRIMARY KEY (team_id, date, event, opponent, map)
+);
+CREATE INDEX IF NOT EXISTS team_maps_by_opponent ON team_maps (opponent, date);
+CREATE TABLE IF NOT EXISTS player_maps (
+    player_id INTEGER NOT NULL,
+    event_id INTEGER NOT NULL,
+    match INTEGER NOT NULL,
+    map INTEGER NOT NULL,
+    is_winner INTEGER,
+    rating REAL,
+    PRIMARY KEY (player_id, event_id, match, map)
+);
+CREATE INDEX IF NOT EXISTS player_maps_by_event ON player_maps (event_id);
+"""
+
+
+def _team_map_row(team_id: int, match: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    """Row of a map from `extract_matches` or None if the row is incomplete."""
+    try:
+        day = datetime.strptime(match["time"], "%d/%m/%y").date()
+        rounds_won, rounds_lost = [int(r) for r in match["rounds"].split("-")]
+        return (
+            int(team_id),
+            str(day),
+            match["event"].lower(),
+            match["opponent"].lower(),
+            match["map"],
+            rounds_won,
+            rounds_lost,
+            match["result"].strip().upper(),
+            int(match["is_last_map"]),
+        )
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+class EntityStore:
+    def __init__(self, path: str):
+        """
+        Events, teams, players, event lineups and map results in a single
+        SQLite file, indexed for lookups across events.
+        :param path: database file, created if missing
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            raise FantasyError.invalid_arguments(f"not such path {directory}")
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _write(self, query: str, rows: List[Tuple[Any, ...]]):
+        with self._lock, self._conn:
+            self._conn.executemany(query, rows)
+
+    def _read(self, query: str, params: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def add_event(self, event_id: int, features: Dict[str, Any], name: str = None):
+        """
+        :param event_id: event's HLTV id
+        :param features: event features, see `Event.features_to_dict`
+        :param name: event's name
+        """
+        row = (
+            int(event_id),
+            name,
+            str(_to_date(features["start_at"])),
+            str(_to_date(features["ends_at"])),
+            int(features["is_lan"]),
+            int(features["is_qual"]),
+            features["prize_pool"],
+        )
+        self._write("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", [row])
+
+    def add_lineups(
+        self,
+        event_id: int,
+        team2player: Dict[int, List[int]],
+        team_id2name: Dict[int, str],
+        player_id2name: Dict[int, str],
+        as_of: Union[date, datetime] = None,
+    ):
+        """
+        Saves teams and players of an event in bulk, in the format of META files.
+        :param as_of: date the lineups were actual at, the event start by default
+        """
+        if as_of is None:
+            rows = self._read(
+                "SELECT start_at FROM events WHERE event_id = ?", (event_id,)
+            )
+            as_of = rows[0][0] if len(rows) > 0 else None
+        as_of = None if as_of is None else str(_to_date(as_of))
+
+        teams = [(int(team_id), name) for team_id, name in team_id2name.items()]
+        players = [(int(player_id), name) for player_id, name in player_id2name.items()]
+        lineups = [
+            (int(event_id), int(team_id), int(player_id), as_of)
+            for team_id, player_ids in team2player.items()
+            for player_id in player_ids
+        ]
+        self._write("INSERT OR REPLACE INTO teams VALUES (?, ?)", teams)
+        self._write("INSERT OR REPLACE INTO players VALUES (?, ?)", players)
+        self._write("INSERT OR REPLACE INTO lineups VALUES (?, ?, ?, ?)", lineups)
+
+    def add_team_maps(self, team_id: int, matches: List[Dict[str, Any]]):
+        """
+        Saves maps of a team, repeated maps of overlapping pages are replaced.
+        :param matches: maps from `Team.extract_matches`
+        """
+        rows = [_team_map_row(team_id, match) for match in matches]
+        rows = [row for row in rows if row is not None]
+        self._write(
+            "INSERT OR REPLACE INTO team_maps VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+
+    def add_player_maps(
+        self, player_id: int, event_id: int, matches: List[Tuple[bool, List[float]]]
+    ):
+        """
+        Saves ratings of a player on every map of the event.
+        :param matches: pairs (match_result, match_ratings) from
+            `Player.extract_matches_stats`
+        """
+        rows = [
+            (int(player_id), int(event_id), i, j, int(is_winner), rating)
+            for i, (is_winner, ratings) in enumerate(matches or [])
+            for j, rating in enumerate(ratings)
+        ]
+        self._write(
+            "INSERT OR REPLACE INTO player_maps VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+
+    def ingest_event_dir(self, event_dir: str, name: str = None):
+        """Saves event and META files written by `parse_event_pages(save="features")`."""
+        event_id = int(os.path.basename(os.path.normpath(event_dir)))
+        maps = dict()
+        for fn in ("event", "team2player", "team_id2name", "player_id2name"):
+            with open(join(event_dir, f"{fn}.json"), "r") as fhandle:
+                maps[fn] = json.load(fhandle)
+
+        self.add_event(event_id, maps["event"], name=name)
+        self.add_lineups(
+            event_id, maps["team2player"], maps["team_id2name"], maps["player_id2name"]
+        )
+
+    def player_events(self, player_id: int) -> List[int]:
+        """:returns: events the player was in lineups of, ordered by date"""
+        rows = self._read(
+            "SELECT event_id FROM lineups WHERE player_id = ? ORDER BY as_of, event_id",
+            (int(player_id),),
+        )
+        return [event_id for event_id, in rows]
+
+    def player_team(
+        self, player_id: int, date_: Union[date, datetime]
+    ) -> Optional[int]:
+        """:returns: team of the latest lineup of the player known at the date"""
+        rows = self._read(
+            "SELECT team_id FROM lineups WHERE player_id = ? AND as_of <= ? "
+            "ORDER BY as_of DESC, event_id DESC LIMIT 1",
+            (int(player_id), str(_to_date(date_))),
+        )
+        return rows[0][0] if len(rows) > 0 else None
+
+    def roster(self, team_id: int, date_: Union[date, datetime]) -> List[int]:
+        """:returns: players of the latest lineup of the team known at the date"""
+        rows = self._read(
+            "SELECT event_id FROM lineups WHERE team_id = ? AND as_of <= ? "
+            "ORDER BY as_of DESC, event_id DESC LIMIT 1",
+            (int(team_id), str(_to_date(date_))),
+        )
+        if len(rows) == 0:
+            return []
+
+        rows = self._read(
+            "SELECT player_id FROM lineups WHERE team_id = ? AND event_id = ? "
+            "ORDER BY player_id",
+            (int(team_id), rows[0][0]),
+        )
+        return [player_id for player_id, in rows]
+
+    def team_maps(
+        self,
+        team_id: int,
+        start: Union[date, datetime] = None,
+        end: Union[date, datetime] = None,
+    ) -> pd.DataFrame:
+        """:returns: maps of the team played in [start, end], ordered by date"""
+        query = "SELECT * FROM team_maps WHERE team_id = ?"
+        params = [int(team_id)]
+        if start is not None:
+            query += " AND date >= ?"
+            params.append(str(_to_date(start)))
+        if end is not None:
+            query += " AND date <= ?"
+            params.append(str(_to_date(end)))
+        query += " ORDER BY date, rowid"
+
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+
+    def player_maps(self, player_id: int, event_ids: List[int] = None) -> pd.DataFrame:
+        """:returns: ratings of the player on maps of the events, all if None"""
+        query = "SELECT * FROM player_maps WHERE player_id = ?"
+        params = [int(player_id)]
+        if event_ids is not None:
+            query += f" AND event_id IN ({', '.join('?' * len(event_ids))})"
+            params.extend(int(event_id) for event_id in event_ids)
+        query += " ORDER BY event_id, match, map"
+
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+
+
+_stores: Dict[str, EntityStore] = dict()
+_stores_lock = threading.Lock()
+
+
+def get_entity_store(path: str) -> EntityStore:
+    """:returns: store of the database file, shared by the process"""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = EntityStore(path)
+        return _stores[key]
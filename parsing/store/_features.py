@@ -0,0 +1,257 @@
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+from parsing.common import Config, EventFilter, FantasyError, RankingFilter
+
+DEFAULT_VERSION = "v1"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS features (
+    entity TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    event_fil TEXT NOT NULL,
+    ranking_fil TEXT NOT NULL,
+    version TEXT NOT NULL,
+    features TEXT NOT NULL,
+    PRIMARY KEY (
+        entity, entity_id, version, event_fil, ranking_fil, end_time, start_time
+    )
+);
+CREATE INDEX IF NOT EXISTS features_by_end ON features (entity, end_time);
+"""
+
+
+class Entity(Enum):
+    """Type of object features describe."""
+
+    TEAM = "team"
+    PLAYER = "player"
+
+    def __str__(self):
+        return self.value
+
+
+def _to_date(value: Union[date, datetime, str]) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+@dataclass(frozen=True)
+class FeatureKey:
+    entity: Entity
+    entity_id: int
+    start_time: date
+    end_time: date
+    event_fil: EventFilter
+    ranking_fil: RankingFilter
+    version: str = DEFAULT_VERSION
+
+    @staticmethod
+    def from_config(
+        entity: Entity, entity_id: int, cfg: Config, version: str = DEFAULT_VERSION
+    ) -> "FeatureKey":
+        """:returns: key of features calculated with filters of `cfg`"""
+        return FeatureKey(
+            entity=entity,
+            entity_id=int(entity_id),
+            start_time=_to_date(cfg.start_time),
+            end_time=_to_date(cfg.end_time),
+            event_fil=cfg.event_fil,
+            ranking_fil=cfg.ranking_fil,
+            version=version,
+        )
+
+    def _row(self) -> Tuple[Any, ...]:
+        return (
+            str(self.entity),
+            self.entity_id,
+            str(self.start_time),
+            str(self.end_time),
+            str(self.event_fil),
+            str(self.ranking_fil),
+            self.version,
+        )
+
+
+class FeatureStore:
+    def __init__(self, path: str):
+        """
+        Point-in-time store of calculated features in a single SQLite file.
+        Rows are keyed by entity, window, filters and features version, so
+        features shared by several events are calculated once.
+        :param path: database file, created if missing
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            raise FantasyError.invalid_arguments(f"not such path {directory}")
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def put(self, key: FeatureKey, features: Dict[str, Any]):
+        """Saves features of the key, replacing previously saved ones."""
+        self.put_many([(key, features)])
+
+    def put_many(self, items: Iterable[Tuple[FeatureKey, Dict[str, Any]]]):
+        """Saves pairs (key, features) in a single transaction."""
+        rows = [
+            key._row() + (json.dumps(features, default=str),) for key, features in items
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def get(self, key: FeatureKey) -> Optional[Dict[str, Any]]:
+        """:returns: saved features of the key or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT features FROM features WHERE entity = ? AND entity_id = ? "
+                "AND start_time = ? AND end_time = ? AND event_fil = ? "
+                "AND ranking_fil = ? AND version = ?",
+                key._row(),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def as_of(
+        self,
+        entity: Entity,
+        entity_id: int,
+        date_: Union[date, datetime],
+        event_fil: EventFilter,
+        ranking_fil: RankingFilter,
+        days: int = None,
+        version: str = DEFAULT_VERSION,
+    ) -> Optional[Tuple[FeatureKey, Dict[str, Any]]]:
+        """
+        Finds the latest features known at the date, i.e. of a window ending
+        at `date_` or before it.
+        :param days: length of the window, any if not specified
+        :returns: pair (key, features) or None
+        """
+        query = (
+            "SELECT start_time, end_time, features FROM features WHERE entity = ? "
+            "AND entity_id = ? AND end_time <= ? AND event_fil = ? "
+            "AND ranking_fil = ? AND version = ?"
+        )
+        params = [
+            str(entity),
+            int(entity_id),
+            str(_to_date(date_)),
+            str(event_fil),
+            str(ranking_fil),
+            version,
+        ]
+        if days is not None:
+            query += " AND julianday(end_time) - julianday(start_time) = ?"
+            params.append(days)
+        query += " ORDER BY end_time DESC, start_time ASC LIMIT 1"
+
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        if row is None:
+            return None
+
+        start_time, end_time, features = row
+        key = FeatureKey(
+            entity=entity,
+            entity_id=int(entity_id),
+            start_time=_to_date(start_time),
+            end_time=_to_date(end_time),
+            event_fil=event_fil,
+            ranking_fil=ranking_fil,
+            version=version,
+        )
+        return key, json.loads(features)
+
+    def query(
+        self,
+        entity: Entity,
+        entity_ids: Iterable[int] = None,
+        end_time: Union[date, datetime] = None,
+        as_of: Union[date, datetime] = None,
+        version: str = DEFAULT_VERSION,
+    ) -> pd.DataFrame:
+        """
+        Loads features of many entities at once.
+        :param entity: type of entities
+        :param entity_ids: ids of entities, all if not specified
+        :param end_time: only windows ending at the date
+        :param as_of: only the latest windows known at the date, one for each
+            entity, filters and window length
+        :param version: features version
+        :returns: frame with entity_id, features, start_time, end_time,
+            event_fil and ranking_fil columns, sorted by the key
+        """
+        query = "SELECT entity_id, start_time, end_time, event_fil, ranking_fil, "
+        query += "features FROM features WHERE entity = ? AND version = ?"
+        params: List[Any] = [str(entity), version]
+        if entity_ids is not None:
+            entity_ids = [int(entity_id) for entity_id in entity_ids]
+            query += f" AND entity_id IN ({', '.join('?' * len(entity_ids))})"
+            params.extend(entity_ids)
+        if end_time is not None:
+            query += " AND end_time = ?"
+            params.append(str(_to_date(end_time)))
+        if as_of is not None:
+            query += " AND end_time <= ?"
+            params.append(str(_to_date(as_of)))
+        query += " ORDER BY entity_id, event_fil, ranking_fil, end_time, start_time"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        records = []
+        for entity_id, start_time, end_time_, event_fil, ranking_fil, features in rows:
+            record = {"entity_id": entity_id}
+            record.update(json.loads(features))
+            record["start_time"] = _to_date(start_time)
+            record["end_time"] = _to_date(end_time_)
+            record["event_fil"] = event_fil
+            record["ranking_fil"] = ranking_fil
+            records.append(record)
+
+        frame = pd.DataFrame(records, index=range(len(records)))
+        if as_of is not None and len(frame) > 0:
+            days = frame["end_time"] - frame["start_time"]
+            groups = [
+                frame["entity_id"],
+                frame["event_fil"],
+                frame["ranking_fil"],
+                days,
+            ]
+            latest = frame.groupby(groups, sort=False)["end_time"].transform("max")
+            frame = frame[frame["end_time"] == latest].reset_index(drop=True)
+        return frame
+
+
+_stores: Dict[str, FeatureStore] = dict()
+_stores_lock = threading.Lock()
+
+
+def get_feature_store(path: str) -> FeatureStore:
+    """:returns: store of the database file, shared by the process"""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = FeatureStore(path)
+        return _stores[key]
@@ -53,7 +53,13 @@ class Team:
         extract_ranking,
     )
     from parsing.team._features import get_features
-    from parsing.team._links import get_profile_link, get_ranking_link, get_stat_link
+    from parsing.team._history import get_history
+    from parsing.team._links import (
+        get_page_link,
+        get_profile_link,
+        get_ranking_link,
+        get_stat_link,
+    )
     from parsing.team._parser import get_page
     from parsing.team._preprocessing import preprocess_stats
     from parsing.team._extractor import extract_lineups
@@ -12,6 +12,18 @@ class TeamStat(Enum):
     def __str__(self):
         return self.value
 
+    @property
+    def markers(self):
+        """HTML fragments any valid page of this type contains."""
+        return _TEAM_STAT_MARKERS[self]
+
+    @property
+    def strainer(self):
+        """Strainer parsing only fragments extractors need from this page."""
+        from parsing.common import page_strainer
+
+        return page_strainer(*_TEAM_STAT_FRAGMENTS[self])
+
 
 class TeamProfile(Enum):
     PROFILE = "profile"  # for API consistency
@@ -19,6 +31,36 @@ class TeamProfile(Enum):
     def __str__(self):
         return self.value
 
+    @property
+    def markers(self):
+        return ("profile-team-stat",)
+
+    @property
+    def strainer(self):
+        from parsing.common import page_strainer
+
+        return page_strainer(("div", "profile-team-stat"))
+
+
+_TEAM_STAT_MARKERS = {
+    TeamStat.OVERVIEW: ("standard-box big-padding", "small-label-below"),
+    TeamStat.MATCHES: ("stats-table",),
+    TeamStat.MAPS: ("stats-table",),
+    TeamStat.PLAYERS: ("stats-table",),
+    TeamStat.EVENT_HISTORY: ("stats-table",),
+    TeamStat.LINEUPS: ("lineup-container",),
+}
+
+# pairs (tag, class) of top-level fragments read by the extractors
+_TEAM_STAT_FRAGMENTS = {
+    TeamStat.OVERVIEW: (("div", "big-padding"),),
+    TeamStat.MATCHES: (("table", "stats-table"),),
+    TeamStat.MAPS: (("table", "stats-table"),),
+    TeamStat.PLAYERS: (("table", "stats-table"),),
+    TeamStat.EVENT_HISTORY: (("table", "stats-table"),),
+    TeamStat.LINEUPS: (("div", "lineup-container"),),
+}
+
 
 BOTTOM_WORLD_RANKING = 50
 BOTTOM_RANKING_CHANGE = 0
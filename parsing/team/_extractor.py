@@ -39,7 +39,19 @@ def extract_profile(self, path: str, src: Tag = None) -> Dict[str, Dict[str, Any
     return {"profile": profile}
 
 
-def extract_ranking(self, path: str, team_name: str, src: Tag = None) -> Dict[str, Dict[str, Any]]:
+def extract_ranking(
+    self, path: str, team_name: str, src: Tag = None, index=None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Method collects team's position in world ranking.
+    :param path: absolute path to the ranking page
+    :param team_name: name of the team to look for
+    :param src: HTML/XML part of parsed tree
+    :param index: `RankingIndex` of the page, makes lookup O(1) instead of a scan
+    """
+    if index is not None:
+        return {"ranking": index.lookup(team_name)}
+
     src = _get_src(path, src)
 
     ranking = {}
@@ -1 +1,10 @@
-from ._features_v1 import get_features
+from ._registry import FEATURES, FeatureRegistry
+from ._features_v1 import VERSION, get_batch_features, get_features
+
+__all__ = [
+    "FEATURES",
+    "FeatureRegistry",
+    "VERSION",
+    "get_batch_features",
+    "get_features",
+]
@@ -2,7 +2,11 @@ from typing import Dict, List, Union
 
 import numpy as np
 import pandas as pd
-from parsing.team._utils import _get_intensity, _get_placement
+from parsing.team._features._intermediates import _group_mean
+from parsing.team._features._registry import FEATURES
+
+VERSION = "v1"
+FEATURES.version(VERSION)
 
 
 def get_features(
@@ -16,47 +20,103 @@ def get_features(
     :param suffix: suffix to append to all features.
     :return: pandas DataFrame with features.
     """
-    features = dict()
+    return get_batch_features([prep_stats], suffix=suffix)
+
+
+def get_batch_features(
+    prep_stats: List[Dict[str, Union[Dict[str, str], List[Dict[str, str]]]]],
+    suffix: str = None,
+    version: str = VERSION,
+    names: List[str] = None,
+) -> pd.DataFrame:
+    """
+    Calculates features for preprocessed stats of many teams and configs at once.
+    Matches and events of all stats are flattened into arrays and aggregated
+    per owner, so the result equals concatenated `get_features` frames.
+    :param prep_stats: list of preprocessed stats.
+    :param suffix: suffix to append to all features.
+    :param version: features version, see `FEATURES`.
+    :param names: features to calculate, all features of the version if None.
+    :return: pandas DataFrame with features, row i for prep_stats[i].
+    """
+    return FEATURES.compute(prep_stats, version=version, names=names, suffix=suffix)
+
+
+@FEATURES.feature("has_roster_change", requires=["lineups"], version=VERSION)
+def has_roster_change(lineups):
+    return np.array([len(lps) > 1 for lps in lineups], dtype=bool)
+
+
+@FEATURES.feature("world_ranking", requires=["ranking"], version=VERSION)
+def world_ranking(ranking):
+    return [rank["world_ranking"] for rank in ranking]
+
+
+@FEATURES.feature("points", requires=["ranking"], version=VERSION)
+def points(ranking):
+    return [rank["points"] for rank in ranking]
+
+
+# features["weeks_in_top30_core"] = prep_stats["profile"]["weeks_in_top30_core"]
+
+
+@FEATURES.feature(
+    "avg_place",
+    requires=["event_counts", "event_owner", "event_placement"],
+    version=VERSION,
+)
+def avg_place(counts, owner, plcmnts):
+    return np.where(counts > 0, _group_mean(owner, plcmnts, len(counts)), np.nan)
 
-    features["has_roster_change"] = len(prep_stats["lineups"]) > 1
-    features["world_ranking"] = prep_stats["ranking"]["world_ranking"]
-    features["points"] = prep_stats["ranking"]["points"]
-    # features["weeks_in_top30_core"] = prep_stats["profile"]["weeks_in_top30_core"]
 
-    events = prep_stats["events"]
-    plcmnts = [_get_placement(e["placement"]) for e in events]
-    features[f"avg_place"] = sum(plcmnts) / len(plcmnts) if len(plcmnts) > 0 else np.nan
+@FEATURES.feature(
+    "winrate", requires=["match_counts", "match_owner", "match_won"], version=VERSION
+)
+def winrate(counts, owner, won):
+    return _group_mean(owner, won, len(counts))
 
-    mtchs = prep_stats["matches"]
-    features[f"winrate"] = sum(m["is_winner"] for m in mtchs) / max(1, len(mtchs))
 
-    features[f"avg_match_intensity"] = sum([_get_intensity(m) for m in mtchs]) / max(
-        1, len(mtchs)
-    )
+@FEATURES.feature(
+    "avg_match_intensity",
+    requires=["match_counts", "match_owner", "match_intensity"],
+    version=VERSION,
+)
+def avg_match_intensity(counts, owner, intensity):
+    return _group_mean(owner, intensity, len(counts))
 
-    wins = [m for m in mtchs if m["is_winner"]]
-    features[f"avg_win_intensity"] = sum([_get_intensity(w) for w in wins]) / max(
-        1, len(wins)
-    )
 
-    losses = [m for m in mtchs if not m["is_winner"]]
-    features[f"avg_loss_intensity"] = sum([_get_intensity(l) for l in losses]) / max(
-        1, len(losses)
-    )
+@FEATURES.feature(
+    "avg_win_intensity",
+    requires=["match_counts", "match_owner", "match_won", "match_intensity"],
+    version=VERSION,
+)
+def avg_win_intensity(counts, owner, won, intensity):
+    won = won.astype(bool)
+    return _group_mean(owner[won], intensity[won], len(counts))
 
-    winstreak = 0
-    for m in mtchs:  # sorted by time already
-        if not m["is_winner"]:
-            break
-        winstreak += 1
 
-    features[f"winstreak"] = winstreak
+@FEATURES.feature(
+    "avg_loss_intensity",
+    requires=["match_counts", "match_owner", "match_won", "match_intensity"],
+    version=VERSION,
+)
+def avg_loss_intensity(counts, owner, won, intensity):
+    lost = ~won.astype(bool)
+    return _group_mean(owner[lost], intensity[lost], len(counts))
 
-    features[f"matches_played"] = len(mtchs)
 
-    features = pd.DataFrame(features, index=[0])
+@FEATURES.feature(
+    "winstreak", requires=["match_counts", "match_owner", "match_won"], version=VERSION
+)
+def winstreak(counts, owner, won):
+    # matches are sorted by time already, winstreak ends at the first loss
+    lost = ~won.astype(bool)
+    position = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    streak = counts.copy()
+    np.minimum.at(streak, owner[lost], position[lost])
+    return streak
 
-    if suffix is not None:
-        features = features.add_suffix(suffix=suffix, axis=1)
 
-    return features
+@FEATURES.feature("matches_played", requires=["match_counts"], version=VERSION)
+def matches_played(counts):
+    return counts
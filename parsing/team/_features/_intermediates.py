@@ -0,0 +1,57 @@
+from typing import Any, Dict, List
+
+import numpy as np
+from parsing.team._features._registry import FEATURES
+from parsing.team._utils import _get_placement
+
+# stats of all entries are flattened into arrays, `*_owner` maps items to entries
+
+
+def _group_mean(owner: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """Sums values of each owner in order and divides by max(1, count)."""
+    total = np.bincount(owner, weights=values, minlength=size)
+    count = np.bincount(owner, minlength=size)
+    return total / np.maximum(1, count)
+
+
+@FEATURES.intermediate("match_counts", requires=["matches"])
+def match_counts(matches: List[List[Dict[str, Any]]]) -> np.ndarray:
+    return np.array([len(mtchs) for mtchs in matches], dtype=np.int64)
+
+
+@FEATURES.intermediate("match_owner", requires=["match_counts"])
+def match_owner(counts: np.ndarray) -> np.ndarray:
+    return np.repeat(np.arange(len(counts)), counts)
+
+
+@FEATURES.intermediate("match_won", requires=["matches"])
+def match_won(matches: List[List[Dict[str, Any]]]) -> np.ndarray:
+    return np.array(
+        [m["is_winner"] for mtchs in matches for m in mtchs], dtype=np.int64
+    )
+
+
+@FEATURES.intermediate("match_intensity", requires=["matches"])
+def match_intensity(matches: List[List[Dict[str, Any]]]) -> np.ndarray:
+    """Same as `_get_intensity` of every match."""
+    rounds_won = [m["rounds_won"] for mtchs in matches for m in mtchs]
+    rounds_lost = [m["rounds_lost"] for mtchs in matches for m in mtchs]
+    rounds_won = np.array(rounds_won, dtype=np.float64)
+    rounds_lost = np.array(rounds_lost, dtype=np.float64)
+    return rounds_won / np.maximum(1, rounds_lost)
+
+
+@FEATURES.intermediate("event_counts", requires=["events"])
+def event_counts(events: List[List[Dict[str, Any]]]) -> np.ndarray:
+    return np.array([len(evs) for evs in events], dtype=np.int64)
+
+
+@FEATURES.intermediate("event_owner", requires=["event_counts"])
+def event_owner(counts: np.ndarray) -> np.ndarray:
+    return np.repeat(np.arange(len(counts)), counts)
+
+
+@FEATURES.intermediate("event_placement", requires=["events"])
+def event_placement(events: List[List[Dict[str, Any]]]) -> np.ndarray:
+    plcmnts = [_get_placement(e["placement"]) for evs in events for e in evs]
+    return np.array(plcmnts, dtype=np.float64)
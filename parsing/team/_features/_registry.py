@@ -0,0 +1,139 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+import pandas as pd
+from parsing.common import FantasyError
+
+# inputs available to features, keys of `preprocess_stats` output
+STATS = ("ranking", "overview", "matches", "events", "lineups")
+
+
+class _Node(NamedTuple):
+    name: str
+    requires: Tuple[str, ...]
+    func: Callable[..., Any]
+
+
+class FeatureContext:
+    """Values of stats and intermediates for a batch of preprocessed stats."""
+
+    def __init__(self, registry: "FeatureRegistry", prep_stats: List[Dict[str, Any]]):
+        self.size = len(prep_stats)
+        self._registry = registry
+        self._prep_stats = prep_stats
+        self._values: Dict[str, Any] = dict()
+        self._pending = set()
+
+    def get(self, name: str) -> Any:
+        """:returns: stats of every entry or memoized value of an intermediate"""
+        if name in self._values:
+            return self._values[name]
+
+        if name in STATS:
+            value = [stats[name] for stats in self._prep_stats]
+        else:
+            value = self._compute(self._registry.intermediate_node(name))
+
+        self._values[name] = value
+        return value
+
+    def _compute(self, node: _Node) -> Any:
+        if node.name in self._pending:
+            raise FantasyError.invalid_arguments(f"cyclic dependency on {node.name}")
+
+        self._pending.add(node.name)
+        try:
+            return node.func(*[self.get(name) for name in node.requires])
+        finally:
+            self._pending.discard(node.name)
+
+    def feature(self, node: _Node) -> Any:
+        return self._compute(node)
+
+
+class FeatureRegistry:
+    """
+    Features grouped by versions. Each feature and shared intermediate declares
+    its inputs (stats or other intermediates), so only requested features are
+    calculated and intermediates are calculated once per batch.
+    """
+
+    def __init__(self):
+        self._intermediates: Dict[str, _Node] = dict()
+        self._versions: Dict[str, Dict[str, _Node]] = dict()
+
+    def intermediate(self, name: str, requires: Sequence[str]):
+        """Registers function of `requires` values shared between features."""
+
+        def decorator(func):
+            if name in self._intermediates or name in STATS:
+                raise FantasyError.invalid_arguments(f"{name} is already registered")
+            self._intermediates[name] = _Node(name, tuple(requires), func)
+            return func
+
+        return decorator
+
+    def version(self, version: str, base: str = None):
+        """
+        Declares features version, optionally starting with features of `base`.
+        Features of the new version with the same name override the base ones.
+        """
+        if version in self._versions:
+            raise FantasyError.invalid_arguments(f"version {version} already exists")
+        self._versions[version] = dict(self._versions[base]) if base else dict()
+
+    def feature(self, name: str, requires: Sequence[str], version: str):
+        """Registers function of `requires` values returning feature of every entry."""
+
+        def decorator(func):
+            self._versions[version][name] = _Node(name, tuple(requires), func)
+            return func
+
+        return decorator
+
+    def intermediate_node(self, name: str) -> _Node:
+        if name not in self._intermediates:
+            raise FantasyError.invalid_arguments(f"unknown input {name}")
+        return self._intermediates[name]
+
+    def features(self, version: str) -> List[str]:
+        """:returns: names of version features in the order of registration"""
+        if version not in self._versions:
+            raise FantasyError.invalid_arguments(f"unknown features version {version}")
+        return list(self._versions[version])
+
+    def compute(
+        self,
+        prep_stats: List[Dict[str, Any]],
+        version: str,
+        names: Sequence[str] = None,
+        suffix: str = None,
+    ) -> pd.DataFrame:
+        """
+        Calculates requested features for a batch of preprocessed stats.
+        :param prep_stats: list of preprocessed stats.
+        :param version: features version.
+        :param names: features to calculate, all features of the version if None.
+        :param suffix: suffix to append to all features.
+        :return: pandas DataFrame with features, row i for prep_stats[i].
+        """
+        nodes = self._versions.get(version)
+        if nodes is None:
+            raise FantasyError.invalid_arguments(f"unknown features version {version}")
+        names = list(nodes) if names is None else list(names)
+        unknown = [name for name in names if name not in nodes]
+        if unknown:
+            raise FantasyError.invalid_arguments(
+                f"unknown {version} features {unknown}"
+            )
+
+        context = FeatureContext(self, prep_stats)
+        features = {name: context.feature(nodes[name]) for name in names}
+        features = pd.DataFrame(features, index=range(len(prep_stats)))
+
+        if suffix is not None:
+            features = features.add_suffix(suffix=suffix, axis=1)
+
+        return features
+
+
+FEATURES = FeatureRegistry()
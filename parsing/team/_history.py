@@ -0,0 +1,162 @@
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from bs4 import Tag
+from parsing.common import EventFilter, FantasyError
+from parsing.team._features import VERSION, get_batch_features
+from parsing.team._preprocessing import (
+    _preprocess_events,
+    _preprocess_lineups,
+    _preprocess_matches,
+)
+
+
+def _to_day(value) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+class MatchHistory:
+    """
+    Full history of a team (matches, events, lineups) loaded once with
+    `startDate=all`. Features of any date window are calculated locally from
+    the matches, events and lineups of the window instead of loading its pages.
+    """
+
+    def __init__(
+        self,
+        matches: List[Dict[str, Any]],
+        events: List[Dict[str, Any]],
+        lineups: List[Dict[str, Any]],
+        opponent_rankings: Optional[np.ndarray] = None,
+    ):
+        """
+        :param matches: preprocessed matches sorted by time, see `_preprocess_matches`
+        :param events: preprocessed events, see `_preprocess_events`
+        :param lineups: preprocessed lineups, see `_preprocess_lineups`
+        :param opponent_rankings: world ranking of the opponent at the date of
+            each match, NaN if unranked
+        """
+        dates = np.array([_to_day(m["date"]) for m in matches], dtype="datetime64[D]")
+        order = np.argsort(dates, kind="stable")  # already sorted for HLTV pages
+        matches = [matches[i] for i in order]
+        self.dates = dates[order]
+
+        self._matches = matches
+        self._events = events
+        self._lineups_stats = lineups
+        self.opponent_rankings = None
+        if opponent_rankings is not None:
+            self.opponent_rankings = np.asarray(opponent_rankings, dtype=np.float64)
+            self.opponent_rankings = self.opponent_rankings[order]
+
+        self._lineups = [
+            (_to_day(lineup["start"]), _to_day(lineup["end"])) for lineup in lineups
+        ]
+
+    def against_top(self, top: int) -> "MatchHistory":
+        """
+        :param top: worst world ranking of opponents, see `RankingFilter.top`
+        :returns: history of matches against opponents ranked `top` or better at
+            the match date, as on pages loaded with the ranking filter
+        """
+        if self.opponent_rankings is None:
+            raise FantasyError.invalid_arguments("opponent rankings are not joined")
+
+        keep = self.opponent_rankings <= top  # unranked opponents are NaN
+        return MatchHistory(
+            [match for match, kept in zip(self._matches, keep) if kept],
+            self._events,
+            self._lineups_stats,
+            self.opponent_rankings[keep],
+        )
+
+    def _bounds(self, windows: List[Tuple[date, date]]) -> Tuple[np.ndarray, ...]:
+        starts = np.array(
+            [_to_day(start) for start, _ in windows], dtype="datetime64[D]"
+        )
+        ends = np.array([_to_day(end) for _, end in windows], dtype="datetime64[D]")
+        lo = np.searchsorted(self.dates, starts, side="left")
+        hi = np.searchsorted(self.dates, ends, side="right")
+        return starts, ends, lo, hi
+
+    def _window_stats(
+        self, start: np.datetime64, end: np.datetime64, lo: int, hi: int
+    ) -> Dict[str, Any]:
+        """Preprocessed stats of a window as on pages loaded for its dates."""
+        matches = self._matches[lo:hi]
+        # events of the window are the ones the team played matches at
+        played = {match["event"] for match in matches}
+        lineups = [
+            lineup
+            for lineup, (begin, finish) in zip(self._lineups_stats, self._lineups)
+            if begin <= end and start <= finish
+        ]
+        return {
+            "matches": matches,
+            "events": [event for event in self._events if event["event"] in played],
+            "lineups": lineups,
+        }
+
+    def get_features(
+        self,
+        windows: List[Tuple[date, date]],
+        rankings: List[Dict[str, Any]],
+        suffix: str = None,
+        version: str = VERSION,
+    ) -> pd.DataFrame:
+        """
+        Calculates features of `Team.get_features` for many date windows at once.
+        Overview stats are not part of the history, so versions using them
+        can not be calculated locally.
+        :param windows: pairs (start, end) of dates, both inclusive
+        :param rankings: preprocessed ranking at the end of each window
+        :param suffix: suffix to append to all features.
+        :param version: features version, see `FEATURES`.
+        :return: pandas DataFrame with features, row i for windows[i].
+        """
+        prep_stats = []
+        for window, ranking in zip(zip(*self._bounds(windows)), rankings):
+            stats = self._window_stats(*window)
+            stats["ranking"] = ranking
+            prep_stats.append(stats)
+
+        return get_batch_features(prep_stats, suffix=suffix, version=version)
+
+
+def get_history(
+    self, pages: Dict[str, Tag], match: EventFilter, ranking_store=None
+) -> MatchHistory:
+    """
+    Method collects full history of a team from parsed pages loaded with
+    `startDate=all`.
+    :param pages: parsed "matches", "events" and "lineups" pages
+    :param match: event filter the pages were loaded with
+    :param ranking_store: `RankingStore` to join opponent ranking at match dates,
+        needed for `MatchHistory.against_top`
+    """
+    matches = self.extract_matches(path=None, src=pages["matches"])["matches"]
+    events = self.extract_events(path=None, src=pages["events"], match=match)["events"]
+    lineups = self.extract_lineups(path=None, src=pages["lineups"])["lineups"]
+    matches = _preprocess_matches(matches)
+
+    opponent_rankings = None
+    if ranking_store is not None:
+        opponent_rankings = np.full(len(matches), np.nan)
+        if len(matches) > 0:
+            frame = pd.DataFrame(
+                {
+                    "team": [m["opponent"] for m in matches],
+                    "date": [m["date"] for m in matches],
+                }
+            )
+            frame = ranking_store.asof_join(frame, team_col="team", date_col="date")
+            opponent_rankings = frame["world_ranking"].to_numpy(dtype=np.float64)
+
+    return MatchHistory(
+        matches,
+        _preprocess_events(events),
+        _preprocess_lineups(lineups),
+        opponent_rankings,
+    )
@@ -2,9 +2,9 @@ from datetime import date
 from datetime import timedelta as td
 from typing import Union
 
-from parsing.common import BASE, EventFilter, Ranking, RankingFilter
+from parsing.common import BASE, EventFilter, FantasyError, Ranking, RankingFilter
 
-from ._constants import TeamStat
+from ._constants import TeamProfile, TeamStat
 
 
 def get_profile_link(self):
@@ -48,3 +48,28 @@ def get_ranking_link(self, ranking: Ranking, date_: date):
     link += f"{date_.day}"
 
     return link
+
+
+def get_page_link(
+    self,
+    page_type: Union[TeamStat, TeamProfile, Ranking],
+    start: date = date.today() - td(weeks=12),
+    end: date = date.today(),
+    event: int = None,
+    match: EventFilter = EventFilter.ALL,
+    rank: RankingFilter = RankingFilter.ALL,
+) -> str:
+    """:returns: canonical URL of the page requested with `get_page`"""
+
+    if isinstance(page_type, TeamProfile):
+        return self.get_profile_link()
+    elif isinstance(page_type, TeamStat):
+        return self.get_stat_link(
+            stat=page_type, start=start, end=end, match=match, event=event, rank=rank
+        )
+    elif str(page_type) == str(
+        Ranking.TEAMS
+    ):  # isinstance(page_type, Ranking) does not work !!!
+        return self.get_ranking_link(ranking=page_type, date_=end)
+
+    raise FantasyError.invalid_arguments("page_type")
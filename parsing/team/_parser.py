@@ -1,12 +1,12 @@
-import os
 from datetime import date, datetime
 from datetime import timedelta as td
 from typing import Union
 
+from parsing.archive import page_exists, save_page
 from parsing.common import EventFilter, FantasyError, Ranking, RankingFilter
+from parsing.fetch import fetch
 from parsing.team._constants import TeamProfile, TeamStat
 from parsing.team._utils import _is_enum_instance
-from selenium import webdriver
 
 
 def get_page(
@@ -33,32 +33,20 @@ def get_page(
     :param return_page: optional, returns page if True.
     """
 
-    if isinstance(page_type, TeamProfile):
-        link = self.get_profile_link()
-    elif isinstance(page_type, TeamStat):
-        link = self.get_stat_link(
-            stat=page_type, start=start, end=end, match=match, event=event, rank=rank
-        )
-    elif str(page_type) == str(
-        Ranking.TEAMS
-    ):  # isinstance(page_type, Ranking) does not work !!!
-        link = self.get_ranking_link(ranking=page_type, date_=end)
-    else:
-        raise FantasyError.invalid_arguments("page_type")
+    link = self.get_page_link(
+        page_type, start=start, end=end, event=event, match=match, rank=rank
+    )
 
-    if data_path and os.path.isfile(data_path):
+    if data_path and page_exists(data_path):
         return
 
-    dr = webdriver.Chrome()
-    dr.get(link)
+    page_source = fetch(link, page_type)
 
     if data_path:
-        os.makedirs(os.path.dirname(data_path), exist_ok=True)
-        with open(data_path, "w", encoding="utf-8") as fhandle:
-            fhandle.write(dr.page_source)
+        save_page(data_path, page_source)
 
     if return_page:
-        return dr.page_source
+        return page_source
 
     if not data_path and not return_page:
         raise FantasyError.invalid_arguments(
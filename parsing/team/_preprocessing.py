@@ -1,8 +1,9 @@
 import re
-from datetime import date, datetime
+from datetime import date
 from typing import Dict, List, Union
 
 import numpy as np
+import pandas as pd
 from dateutil.parser import parse
 from parsing.team._constants import (
     BOTTOM_POINTS,
@@ -10,6 +11,9 @@ from parsing.team._constants import (
     BOTTOM_WORLD_RANKING,
 )
 
+# type of rounds summed onto python 0 row by row, differs in numpy 1 and 2
+ROUNDS_DTYPE = (0 + np.int32(0)).dtype
+
 
 def preprocess_stats(
     self, stats: Dict[str, Union[Dict[str, str], List[Dict[str, str]]]]
@@ -105,51 +109,58 @@ def _preprocess_overview(overview: Dict[str, str]) -> Dict[str, str]:
 def _preprocess_matches(matches: List[Dict[str, str]]) -> List[Dict[str, str]]:
     """
     Despite preprocessing, converts individual maps info into matches info.
+    Maps are parsed column-wise and summed over matches bounded by `is_last_map`.
     :param matches: this is not 'matches' played but 'maps' played.
     """
-    data = []
+    if len(matches) == 0:
+        return []
+
+    maps = pd.DataFrame(matches[::-1])  # iterating according to timeline
+    ends = np.flatnonzero(maps["is_last_map"].to_numpy(dtype=bool)) + 1
+    if len(ends) == 0:
+        return []
+    starts = np.concatenate(([0], ends[:-1]))
+    maps = maps.iloc[: ends[-1]]  # maps of an unfinished match are dropped
+
+    results = maps["result"].str.lower()
+    maps_won = (results == "w").to_numpy(dtype=np.int64)
+    maps_won = np.add.reduceat(maps_won, starts, dtype=np.int64)
+    maps_lost = (results == "l").to_numpy(dtype=np.int64)
+    maps_lost = np.add.reduceat(maps_lost, starts, dtype=np.int64)
+
+    rounds = maps["rounds"].str.split("-", expand=True)
+    rounds_won = rounds[0].str.strip().to_numpy(dtype=np.int32)
+    rounds_lost = rounds[1].str.strip().to_numpy(dtype=np.int32)
+    rounds_won = np.add.reduceat(rounds_won, starts, dtype=ROUNDS_DTYPE)
+    rounds_lost = np.add.reduceat(rounds_lost, starts, dtype=ROUNDS_DTYPE)
+    rounds_played = rounds_won + rounds_lost
+
+    results = results.tolist()
+    rounds_seq = (maps["rounds"].str.strip() + "|").tolist()
+
+    first = maps.iloc[starts]
+    opponents = first["opponent"].str.lower().tolist()
+    dates = pd.to_datetime(first["time"], format="%d/%m/%y").dt.date.tolist()
+    events = first["event"].str.lower().tolist()
 
-    cur_match = dict()
-    is_new_match = True
-    for map_ in reversed(matches):  # iterating according to timeline
-        if is_new_match:
-            cur_match["opponent"] = map_["opponent"].lower()
-            cur_match["date"] = datetime.strptime(map_["time"], "%d/%m/%y").date()
-            cur_match["event"] = map_["event"].lower()
-
-            cur_match["maps_played"] = 0
-            cur_match["maps_won"] = 0
-            cur_match["maps_lost"] = 0
-            cur_match["maps_res_seq"] = ""
-
-            cur_match["rounds_played"] = 0
-            cur_match["rounds_won"] = 0
-            cur_match["rounds_lost"] = 0
-            cur_match["rounds_res_seq"] = ""
-
-            cur_match["is_winner"] = None
-
-            is_new_match = False
-
-        cur_match["maps_played"] += 1
-        cur_match["maps_won"] += int(map_["result"].lower() == "w")
-        cur_match["maps_lost"] += int(map_["result"].lower() == "l")
-        cur_match["maps_res_seq"] += map_["result"].lower()
-
-        rounds = map_["rounds"].split("-")
-        rounds_won = np.int32(rounds[0].strip())
-        rounds_lost = np.int32(rounds[1].strip())
-        cur_match["rounds_played"] += rounds_won + rounds_lost
-        cur_match["rounds_won"] += rounds_won
-        cur_match["rounds_lost"] += rounds_lost
-        cur_match["rounds_res_seq"] += map_["rounds"].strip() + "|"
-
-        if map_["is_last_map"]:
-            cur_match["is_winner"] = int(cur_match["maps_won"] > cur_match["maps_lost"])
-
-            data.append(cur_match.copy())  # shallow copy is enough
-            is_new_match = True
-            cur_match = {}
+    data = []
+    for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        data.append(
+            {
+                "opponent": opponents[i],
+                "date": dates[i],
+                "event": events[i],
+                "maps_played": end - start,
+                "maps_won": int(maps_won[i]),
+                "maps_lost": int(maps_lost[i]),
+                "maps_res_seq": "".join(results[start:end]),
+                "rounds_played": rounds_played[i],
+                "rounds_won": rounds_won[i],
+                "rounds_lost": rounds_lost[i],
+                "rounds_res_seq": "".join(rounds_seq[start:end]),
+                "is_winner": int(maps_won[i] > maps_lost[i]),
+            }
+        )
 
     return data
 